@@ -10,5 +10,7 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=Roles.choices, default=Roles.SALESPERSON)
     address = models.TextField(blank=True, null=True)
     phone_number = models.BigIntegerField(blank=True, null=True,unique=True)
+    # Names are embedded in cached lists (see quotations.conditional).
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.role})"
@@ -7,15 +7,22 @@ from django.views.decorators.http import require_POST, require_http_methods
 from django.utils.decorators import method_decorator
 from django.views.generic import View
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from apps.quotations.models import Quotation, ActivityAction, ActivityLog, QuotationStatus, Lead,LeadStatus
 from datetime import datetime
 import json
+import logging
 import traceback
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from apps.accounts.models import User,Roles
 from apps.quotations.views import JWTAuthMixin,AdminRequiredMixin
+from apps.quotations.activity_buffer import buffered_activity_logs
+from apps.quotations.status_cascade import cascade_lead_status, cascade_quotation_status
+
+logger = logging.getLogger(__name__)
+
 class ProtectedView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -306,6 +313,7 @@ class ChangePasswordView(APIView):
 
 # ========== Quotation Status Update API ==========
 class QuotationStatusUpdateView(JWTAuthMixin, BaseAPIView):
+    @buffered_activity_logs()
     def put(self, request, quotation_id):
         quotation = get_object_or_404(Quotation, pk=quotation_id)
         
@@ -338,54 +346,14 @@ class QuotationStatusUpdateView(JWTAuthMixin, BaseAPIView):
                 message=message,
                 customer=quotation.customer,
             )
-            # Cascade quotation -> lead status changes
+            # Cascade quotation -> lead status changes, in a savepoint so a
+            # failure leaves the update itself to commit.
             try:
-                if quotation.lead_id:
-                    lead = Lead.objects.filter(pk=quotation.lead_id).first()
-                    if lead:
-                        # If quotation accepted -> mark lead converted
-                        if quotation.status == QuotationStatus.ACCEPTED and lead.status != 'CONVERTED':
-                            old_lead_status = lead.status
-                            lead.status = 'CONVERTED'
-                            lead.save(update_fields=['status'])
-                            ActivityLog.log(
-                                actor=request.user,
-                                action=ActivityAction.LEAD_STATUS_CHANGED,
-                                entity=lead,
-                                message=f"Status changed from {old_lead_status} to {lead.status} due to quotation {quotation.quotation_number}",
-                                customer=lead.customer,
-                            )
-                        # If quotation rejected -> mark lead lost
-                        if quotation.status == QuotationStatus.REJECTED and lead.status != 'LOST':
-                            old_lead_status = lead.status
-                            lead.status = 'LOST'
-                            lead.save(update_fields=['status'])
-                            ActivityLog.log(
-                                actor=request.user,
-                                action=ActivityAction.LEAD_STATUS_CHANGED,
-                                entity=lead,
-                                message=f"Status changed from {old_lead_status} to {lead.status} due to quotation {quotation.quotation_number}",
-                                customer=lead.customer,
-                            )
-                        # If quotation revised -> mark lead negotiation
-                        if quotation.status == QuotationStatus.REVISED and lead.status != LeadStatus.NEGOTIATION:
-                            try:
-                                old_lead_status = lead.status
-                                lead.status = LeadStatus.NEGOTIATION
-                                lead.save(update_fields=['status'])
-                                ActivityLog.log(
-                                    actor=request.user,
-                                    action=ActivityAction.LEAD_STATUS_CHANGED,
-                                    entity=lead,
-                                    message=f"Status changed from {old_lead_status} to {lead.status} due to quotation {quotation.quotation_number}",
-                                    customer=lead.customer,
-                                )
-                            except Exception:
-                                # Non-fatal: continue even if cascading fails
-                                pass
+                with transaction.atomic():
+                    cascade_quotation_status(quotation, request.user)
             except Exception:
                 # Don't let cascading failures block the main update
-                pass
+                logger.exception("Quotation -> lead status cascade failed for quotation %s", quotation.id)
             
             return JsonResponse({
                 'success': True,
@@ -408,6 +376,7 @@ class QuotationStatusUpdateView(JWTAuthMixin, BaseAPIView):
                 }
             })
 class LeadStatusUpdateView(JWTAuthMixin,BaseAPIView):
+    @buffered_activity_logs()
     def put(self, request, lead_id):
         try:
             lead = get_object_or_404(Lead, pk=lead_id)
@@ -466,55 +435,11 @@ class LeadStatusUpdateView(JWTAuthMixin,BaseAPIView):
 
                 # Cascade lead -> quotation status changes
                 try:
-                    # If lead converted -> mark related quotations accepted
-                    if lead.status == 'CONVERTED':
-                        related_qs = Quotation.objects.filter(lead_id=lead.id).exclude(status=QuotationStatus.ACCEPTED)
-                        for q in related_qs:
-                            old_q_status = q.status
-                            q.status = QuotationStatus.ACCEPTED
-                            q.save(update_fields=['status'])
-                            ActivityLog.log(
-                                actor=request.user,
-                                action=ActivityAction.QUOTATION_STATUS_CHANGED,
-                                entity=q,
-                                message=f"Status changed from {old_q_status} to {q.status} due to lead {lead.id} conversion",
-                                customer=q.customer,
-                            )
-                    # If lead lost -> mark related quotations rejected
-                    if lead.status == LeadStatus.LOST:
-                        related_qs = Quotation.objects.filter(lead_id=lead.id).exclude(status=QuotationStatus.REJECTED)
-                        for q in related_qs:
-                            old_q_status = q.status
-                            q.status = QuotationStatus.REJECTED
-                            q.save(update_fields=['status'])
-                            ActivityLog.log(
-                                actor=request.user,
-                                action=ActivityAction.QUOTATION_STATUS_CHANGED,
-                                entity=q,
-                                message=f"Status changed from {old_q_status} to {q.status} due to lead {lead.id} lost",
-                                customer=q.customer,
-                            )
-                    # If lead negotiation -> mark related quotations revised
-                    if lead.status == LeadStatus.NEGOTIATION:
-                        related_qs = Quotation.objects.filter(lead_id=lead.id).exclude(status=QuotationStatus.REVISED)
-                        for q in related_qs:
-                            try:
-                                old_q_status = q.status
-                                q.status = QuotationStatus.REVISED
-                                q.save(update_fields=['status'])
-                                ActivityLog.log(
-                                    actor=request.user,
-                                    action=ActivityAction.QUOTATION_STATUS_CHANGED,
-                                    entity=q,
-                                    message=f"Status changed from {old_q_status} to {q.status} due to lead {lead.id} negotiation",
-                                    customer=q.customer,
-                                )
-                            except Exception:
-                                # Non-fatal: continue even if one update fails
-                                pass
+                    with transaction.atomic():
+                        cascade_lead_status(lead, request.user)
                 except Exception:
                     # Non-fatal: continue even if cascading fails
-                    pass
+                    logger.exception("Lead -> quotation status cascade failed for lead %s", lead.id)
 
                 return JsonResponse({
                     'success': True,
@@ -539,6 +464,7 @@ class LeadStatusUpdateView(JWTAuthMixin,BaseAPIView):
                 }
             })
         except Exception as e:
+            transaction.set_rollback(True)
             return JsonResponse({
                 'success': False,
                 'error': str(e),
@@ -0,0 +1,66 @@
+# File: activity_buffer.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+
+_current = ContextVar('activity_log_buffer', default=None)
+
+
+def _write(entries):
+    if entries:
+        type(entries[0]).objects.bulk_create(entries)
+
+
+class ActivityLogBuffer:
+    """
+    Unsaved ActivityLog rows, grouped by the savepoint stack they were
+    logged under. Each group is bulk-inserted by an on_commit callback
+    registered when its first row arrives, so a group logged inside a
+    savepoint that rolls back is discarded with it. Savepoint ids are never
+    reused, and the buffer only lives inside buffered_activity_logs()'s own
+    atomic block, so a key always names the same (sub)transaction.
+    """
+
+    def __init__(self, using=None):
+        self.using = using
+        self._groups = {}
+
+    def add(self, entry):
+        key = tuple(transaction.get_connection(self.using).savepoint_ids)
+        entries = self._groups.get(key)
+        if entries is None:
+            entries = self._groups[key] = []
+            transaction.on_commit(partial(_write, entries), using=self.using)
+        entries.append(entry)
+
+
+def current_buffer():
+    return _current.get()
+
+
+@contextmanager
+def buffered_activity_logs(using=None):
+    """
+    Runs the block in transaction.atomic() and collects the ActivityLog.log()
+    calls made inside it, so the logs commit or roll back together with the
+    changes they describe. They are bulk-inserted once the transaction
+    commits; logs from a rolled-back savepoint are never written. Nested
+    blocks share the outermost buffer and get their own savepoint. Usable as
+    a decorator.
+    """
+    buffer = _current.get()
+    if buffer is not None:
+        with transaction.atomic(using=using):
+            yield buffer
+        return
+
+    buffer = ActivityLogBuffer(using)
+    token = _current.set(buffer)
+    try:
+        with transaction.atomic(using=using):
+            yield buffer
+    finally:
+        _current.reset(token)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CompanyProfile, Customer, Product, TermsAndConditions, EmailTemplate, Lead, Quotation, EmailLog, ActivityLog,Category,LeadDescription,SignatureImage,ProductImage
+from .models import CompanyProfile, Customer, Product, TermsAndConditions, EmailTemplate, Lead, Quotation, EmailLog, ActivityLog,Category,LeadDescription,SignatureImage,ProductImage,PDFRenderJob,PDFRenderBatch
 
 @admin.register(CompanyProfile)
 class CompanyProfileAdmin(admin.ModelAdmin):
@@ -67,3 +67,15 @@ class SignatureImageAdmin(admin.ModelAdmin):
 class ProductImageAdmin(admin.ModelAdmin):
     list_display = ('product', 'quotation', 'image', 'created_at')
     search_fields = ('product__name', 'quotation__quotation_number')
+
+
+@admin.register(PDFRenderJob)
+class PDFRenderJobAdmin(admin.ModelAdmin):
+    list_display = ('quotation', 'status', 'attempts', 'requested_by', 'batch', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('quotation__quotation_number', 'error')
+
+
+@admin.register(PDFRenderBatch)
+class PDFRenderBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'total', 'requested_by', 'created_at')
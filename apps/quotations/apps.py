@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class QuotationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.quotations'
+
+    def ready(self):
+        from . import autocomplete, dashboard  # noqa: F401  (register their signals)
+        if getattr(settings, 'PRODUCT_AUTOCOMPLETE_WARM', False):
+            try:
+                autocomplete.product_index.build()
+            except Exception:
+                # Builds lazily on the first suggestion instead.
+                pass
+        if getattr(settings, 'PDF_WARM_ASSETS', False):
+            from .pdf_assets import warm_up
+            try:
+                warm_up()
+            except Exception:
+                # Warm-up is an optimisation only; assets load lazily on first use.
+                pass
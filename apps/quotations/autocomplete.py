@@ -0,0 +1,154 @@
+# File: autocomplete.py
+
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .conditional import queryset_validator
+from .models import Category, Product
+from .search import PRODUCT_RESULT
+
+INVALIDATION_KEY = 'qms:product_index_invalidated'
+
+
+def normalize(text):
+    """Casefolded, accents stripped, anything but letters and digits as single spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return ' '.join(re.split(r'[\W_]+', text)).strip()
+
+
+def _keys(product):
+    """Every word start of the name and brand, so `chair` finds `Office Chair`."""
+    keys = set()
+    for field in ('name', 'brand'):
+        words = normalize(product[field]).split()
+        keys.update(' '.join(words[i:]) for i in range(len(words)))
+    return keys
+
+
+class ProductIndex:
+    """
+    Per-process prefix index of product names and brands: a sorted list of
+    (key, product id) searched with bisect. Saves and deletes in this
+    process update it in place so they show up at once. Every process
+    (this one included) checks a stamp at most every
+    PRODUCT_AUTOCOMPLETE_CHECK_SECONDS and rebuilds when it has moved. The
+    stamp is derived from the data, like the list ETags: count, newest
+    updated_at and highest id of products and categories, plus a random
+    token that invalidate() writes for changes that skip updated_at. Two
+    processes changing products at once can't end up with the same stamp.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = []
+        self._products = {}
+        self._keys = {}
+        self._version = None
+        self._checked_at = 0.0
+
+    def _current_version(self):
+        return (
+            queryset_validator(Product.objects.all()),
+            queryset_validator(Category.objects.all()),
+            cache.get(INVALIDATION_KEY),
+        )
+
+    def build(self):
+        version = self._current_version()
+        products = {row['id']: row for row in PRODUCT_RESULT.rows(Product.objects.exclude(active=False))}
+        keys = {product_id: _keys(product) for product_id, product in products.items()}
+        entries = sorted((key, product_id) for product_id, product_keys in keys.items() for key in product_keys)
+        with self._lock:
+            self._products, self._keys, self._entries = products, keys, entries
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def _ensure_current(self):
+        interval = getattr(settings, 'PRODUCT_AUTOCOMPLETE_CHECK_SECONDS', 2.0)
+        if self._version is not None and time.monotonic() - self._checked_at < interval:
+            return
+        if self._version != self._current_version():
+            self.build()
+        else:
+            self._checked_at = time.monotonic()
+
+    def _remove(self, product_id):
+        for key in self._keys.pop(product_id, ()):
+            index = bisect_left(self._entries, (key, product_id))
+            if index < len(self._entries) and self._entries[index] == (key, product_id):
+                del self._entries[index]
+        self._products.pop(product_id, None)
+
+    def update(self, product_id):
+        if self._version is None:
+            return
+        rows = PRODUCT_RESULT.rows(Product.objects.filter(pk=product_id).exclude(active=False))
+        with self._lock:
+            self._remove(product_id)
+            if rows:
+                product = rows[0]
+                self._products[product_id] = product
+                self._keys[product_id] = _keys(product)
+                for key in self._keys[product_id]:
+                    insort(self._entries, (key, product_id))
+
+    def delete(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def invalidate(self):
+        """For changes that skip signals (bulk_create, update())."""
+        with self._lock:
+            self._version = None
+        cache.set(INVALIDATION_KEY, f'{time.time_ns()}-{uuid.uuid4().hex}', timeout=None)
+
+    def suggest(self, prefix, limit=10):
+        """Up to `limit` products with a name or brand word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_current()
+        with self._lock:
+            entries, products = self._entries, self._products
+            matches = []
+            seen = set()
+            index = bisect_left(entries, (prefix,))
+            while len(matches) < limit and index < len(entries) and entries[index][0].startswith(prefix):
+                product_id = entries[index][1]
+                if product_id not in seen:
+                    seen.add(product_id)
+                    matches.append(products[product_id])
+                index += 1
+        return matches
+
+
+product_index = ProductIndex()
+
+
+@receiver(post_save, sender=Product)
+def _product_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: product_index.update(instance.pk))
+
+
+@receiver(post_delete, sender=Product)
+def _product_deleted(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: product_index.delete(product_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def _category_changed(sender, **kwargs):
+    # Category names are part of every suggestion under it.
+    transaction.on_commit(product_index.invalidate)
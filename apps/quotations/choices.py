@@ -101,6 +101,12 @@ class LeadSource(models.TextChoices):
     EXISTING_CUSTOMER = 'EXISTING_CUSTOMER', _('Existing Customer')
     OTHER = 'OTHER', _('Other')
 
+class PDFJobStatus(models.TextChoices):
+    PENDING = 'PENDING', _('Pending')
+    RUNNING = 'RUNNING', _('Running')
+    DONE = 'DONE', _('Done')
+    FAILED = 'FAILED', _('Failed')
+
 class Priority(models.TextChoices):
     LOW = 'LOW', _('Low')
     MEDIUM = 'MEDIUM', _('Medium')
@@ -0,0 +1,50 @@
+# File: conditional.py
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+
+def queryset_validator(queryset, field='updated_at'):
+    """(row count, newest `field`, highest id) of `queryset` in one aggregate query."""
+    stats = queryset.order_by().aggregate(count=Count('id'), latest=Max(field), last_id=Max('id'))
+    return stats['count'], stats['latest'], stats['last_id']
+
+
+class ConditionalGetMixin:
+    """
+    ETag and If-None-Match handling for GET. Subclasses implement
+    `get_validator(request)`, something cheap that changes whenever the
+    response would (see queryset_validator), including the user's scope for
+    role-filtered lists. A matching If-None-Match gets a 304 before the view
+    runs. List it after JWTAuthMixin so that request.user is set.
+    """
+
+    def get_validator(self, request):
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        validator = repr((self.get_validator(request), request.path, sorted(request.GET.lists())))
+        return quote_etag(hashlib.sha1(validator.encode('utf-8')).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = self.get_etag(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        client_etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match or '')]
+        if etag in client_etags or '*' in client_etags:
+            response = HttpResponseNotModified()
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,68 @@
+# File: dashboard.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import User, Roles
+from .models import Customer, Lead, Product, Quotation
+
+CACHE_KEY = 'qms:admin_dashboard_stats'
+
+
+def _compute_admin_stats():
+    salespeople = User.objects.filter(role=Roles.SALESPERSON).aggregate(
+        total=Count('id'), active=Count('id', filter=Q(is_active=True)),
+    )
+    return {
+        'total_salespeople': salespeople['total'],
+        'active_salespeople': salespeople['active'],
+        'total_quotations': Quotation.objects.count(),
+        'total_leads': Lead.objects.count(),
+        'total_customers': Customer.objects.count(),
+        'total_products': Product.objects.filter(active=True).count(),
+    }
+
+
+def admin_dashboard_stats():
+    """
+    Counts for the admin home screen: one query per table, cached for
+    ADMIN_DASHBOARD_CACHE_SECONDS and dropped as soon as a counted row is
+    added, removed or (for users and products) changes state.
+    """
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = _compute_admin_stats()
+        cache.set(CACHE_KEY, stats, getattr(settings, 'ADMIN_DASHBOARD_CACHE_SECONDS', 60))
+    return stats
+
+
+def invalidate_admin_dashboard_stats():
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Product)
+def _counted_state_changed(sender, **kwargs):
+    # role / is_active and active can change on any save.
+    invalidate_admin_dashboard_stats()
+
+
+@receiver(post_save, sender=Quotation)
+@receiver(post_save, sender=Lead)
+@receiver(post_save, sender=Customer)
+def _counted_row_saved(sender, created, **kwargs):
+    if created:
+        invalidate_admin_dashboard_stats()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Quotation)
+@receiver(post_delete, sender=Lead)
+@receiver(post_delete, sender=Customer)
+def _counted_row_deleted(sender, **kwargs):
+    invalidate_admin_dashboard_stats()
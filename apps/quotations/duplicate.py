@@ -1,5 +1,6 @@
 from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -69,7 +70,7 @@ class DuplicateQuotationAPIView(APIView):
 
             # Step 4: If a new lead was created, link it back to the new quotation.
             if new_lead_id:
-                Lead.objects.filter(pk=new_lead_id).update(quotation_id=new_quotation.pk)
+                Lead.objects.filter(pk=new_lead_id).update(quotation_id=new_quotation.pk, updated_at=timezone.now())
 
             # Step 5: Copy the ManyToMany relationship for terms.
             if original_terms:
@@ -161,8 +161,10 @@ class LeadForm(forms.ModelForm):
                     update_fields[field] = value
 
             if update_fields:
-                Customer.objects.filter(pk=customer.pk).update(**update_fields)
-                customer.refresh_from_db()
+                # save() rather than update() so the company directory signals run.
+                for field, value in update_fields.items():
+                    setattr(customer, field, value)
+                customer.save(update_fields=list(update_fields))
 
         cleaned_data['customer'] = customer
         return cleaned_data
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.quotations.models import ActivityLogArchive
+
+
+class Command(BaseCommand):
+    help = "Move old activity logs out of the live table into the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 365),
+            help='Archive logs older than this many days.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows moved per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        moved = ActivityLogArchive.archive_before(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(f"Archived {moved} activity log(s) created before {cutoff:%Y-%m-%d}")
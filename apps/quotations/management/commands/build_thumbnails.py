@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.quotations.models import Product, ProductImage, SignatureImage
+from apps.quotations.thumbnails import (
+    build_product_derivatives,
+    build_product_image_derivatives,
+    build_signature_derivatives,
+)
+
+
+class Command(BaseCommand):
+    help = "Build PDF and list-size derivatives for images uploaded before they existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild derivatives that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        targets = [
+            ('products', Product.objects.exclude(image=''), build_product_derivatives),
+            ('product images', ProductImage.objects.all(), build_product_image_derivatives),
+            ('signatures', SignatureImage.objects.all(), build_signature_derivatives),
+        ]
+        for label, queryset, build in targets:
+            if not options['force']:
+                queryset = queryset.filter(Q(image_pdf='') | Q(image_pdf__isnull=True))
+            built = 0
+            for obj in queryset.exclude(image__isnull=True).iterator():
+                if build(obj):
+                    built += 1
+            self.stdout.write(f"{label}: built derivatives for {built} record(s)")
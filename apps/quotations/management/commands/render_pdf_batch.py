@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quotations.models import PDFRenderBatch
+from apps.quotations.pdf_queue import create_pdf_batch, resume_pdf_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render the PDFs of every quotation matching the filters, e.g. after a "
+        "letterhead or terms change. An interrupted run continues with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='Created on or after (YYYY-MM-DD).')
+        parser.add_argument('--date-to', help='Created on or before (YYYY-MM-DD).')
+        parser.add_argument('--status', help='Quotation status, e.g. SENT.')
+        parser.add_argument('--salesperson', type=int, help='Assigned salesperson id.')
+        parser.add_argument(
+            '--resume', type=int, metavar='BATCH_ID',
+            help='Continue an earlier batch instead of starting a new one.',
+        )
+        parser.add_argument(
+            '--base-url', default='',
+            help='Site root used to build absolute file URLs.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'PDF_RENDER_WORKERS', 2),
+            help='Number of rendering processes.',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild every PDF, even when a stored one matches.',
+        )
+        parser.add_argument(
+            '--queue-only', action='store_true',
+            help='Only queue the jobs and leave them to the render_pdfs worker.',
+        )
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                batch = PDFRenderBatch.objects.get(pk=options['resume'])
+            except PDFRenderBatch.DoesNotExist:
+                raise CommandError(f"PDF batch {options['resume']} does not exist")
+            requeued = resume_pdf_batch(batch)
+            self.stdout.write(f"Resuming batch {batch.id}: {requeued} job(s) re-queued")
+        else:
+            filters = {
+                'date_from': options['date_from'],
+                'date_to': options['date_to'],
+                'status': options['status'],
+                'salesperson': options['salesperson'],
+            }
+            try:
+                batch = create_pdf_batch(filters, base_url=options['base_url'], force=options['force'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"Created batch {batch.id} with {batch.total} quotation(s)")
+
+        if not options['queue_only']:
+            call_command('render_pdfs', batch=batch.id, once=True, workers=options['workers'], stdout=self.stdout)
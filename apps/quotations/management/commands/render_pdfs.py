@@ -0,0 +1,71 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def _init_worker():
+    # Worker processes are spawned fresh, so Django has to be set up again
+    # before any model can be imported.
+    django.setup()
+
+
+def _run_job(job_id):
+    from apps.quotations.pdf_queue import run_pdf_job
+    return run_pdf_job(job_id)
+
+
+class Command(BaseCommand):
+    help = "Render queued quotation PDFs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'PDF_RENDER_WORKERS', 2),
+            help='Number of rendering processes.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Jobs claimed per poll (defaults to 4 per worker).',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Seconds to sleep when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue and exit instead of polling forever.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=None,
+            help='Only render jobs of this PDF batch and report its progress.',
+        )
+
+    def handle(self, *args, **options):
+        from apps.quotations.models import PDFRenderBatch
+        from apps.quotations.pdf_queue import claim_pdf_jobs, batch_progress
+
+        workers = max(1, options['workers'])
+        batch_size = options['batch_size'] or workers * 4
+        context = multiprocessing.get_context('spawn')
+        batch = PDFRenderBatch.objects.get(pk=options['batch']) if options['batch'] else None
+
+        self.stdout.write(f"Rendering PDFs with {workers} worker(s)")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            while True:
+                job_ids = claim_pdf_jobs(batch_size, batch_id=batch.id if batch else None)
+                if job_ids:
+                    for job_id, status in zip(job_ids, pool.map(_run_job, job_ids)):
+                        self.stdout.write(f"PDF job {job_id}: {status or 'skipped'}")
+                    if batch:
+                        progress = batch_progress(batch)
+                        self.stdout.write(
+                            f"Batch {batch.id}: {progress['done']} done, {progress['failed']} failed "
+                            f"of {progress['total']} ({progress['percent']}%)"
+                        )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
@@ -1,72 +1,238 @@
+import hashlib
 import os
-import io
-import requests
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
+from urllib.parse import urlparse, unquote
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
 import PyPDF2
 
+from .models import Quotation
+from .pdf_images import get_session
+from .pdf_queue import enqueue_stored_quotation_pdfs
+from .save_quotation import render_quotation_pdf, quotation_items_data
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+HASH_CACHE_PREFIX = 'qms:pdf_hash:'
+BUNDLE_HIT_COUNTER = 'merge_cache.hits'
+BUNDLE_MISS_COUNTER = 'merge_cache.misses'
 
-def merge_pdfs_from_urls(pdf_urls, request, save_folder='merged_pdfs'):
-    try:
-        merger = PyPDF2.PdfMerger()
-        successful_urls = []
 
-        for url in pdf_urls:
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                pdf_file = io.BytesIO(response.content)
+def _media_path(url_path):
+    """Resolves a MEDIA_URL path to an existing file under MEDIA_ROOT, or None."""
+    media = urlparse(settings.MEDIA_URL)
+    if not url_path.startswith(media.path):
+        return None
+
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(media_root, unquote(url_path[len(media.path):])))
+    if not path.startswith(media_root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _local_media_path(url, request):
+    """
+    Maps a URL pointing at our own MEDIA_URL to the file under MEDIA_ROOT,
+    so we don't fetch our own files back over HTTP. Returns None otherwise.
+    """
+    parsed = urlparse(url)
+    if parsed.netloc and parsed.netloc not in (request.get_host(), urlparse(settings.MEDIA_URL).netloc):
+        return None
+    return _media_path(parsed.path)
+
 
-                # Validate PDF before appending
-                PyPDF2.PdfReader(pdf_file)
-                pdf_file.seek(0)
-                merger.append(pdf_file)
+def _download(url):
+    """Streams a remote PDF to a temp file and returns its path."""
+    timeout = getattr(settings, 'PDF_MERGE_FETCH_TIMEOUT', 10)
+    with get_session().get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
+    return tmp.name
 
-                successful_urls.append(url)
+
+def _fetch_sources(pdf_urls, request):
+    """
+    Returns [(url, path, is_temp)] in input order; path is None for URLs that
+    could not be fetched. Remote URLs are downloaded by a bounded pool.
+    """
+    sources = [(url, _local_media_path(url, request)) for url in pdf_urls]
+    remote = [url for url, path in sources if path is None]
+    downloaded = {}
+    if remote:
+        workers = min(len(remote), getattr(settings, 'PDF_MERGE_FETCH_WORKERS', 4))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {url: pool.submit(_download, url) for url in dict.fromkeys(remote)}
+        for url, future in futures.items():
+            try:
+                downloaded[url] = future.result()
             except Exception as e:
                 logger.warning(f"Skipping PDF {url} due to error: {e}")
+                downloaded[url] = None
+    return [
+        (url, path, False) if path else (url, downloaded.get(url), True)
+        for url, path in sources
+    ]
+
+
+def _write_merged(sources, full_path):
+    """
+    Appends each (label, path) PDF to a merger and streams the result to
+    full_path. Unreadable files are skipped; returns the labels merged.
+    """
+    merger = PyPDF2.PdfMerger()
+    merged = []
+    with ExitStack() as stack:
+        for label, path in sources:
+            if path is None:
+                continue
+            try:
+                # One parse per file: reading the page tree validates it,
+                # and the merger appends from the same reader.
+                reader = PyPDF2.PdfReader(stack.enter_context(open(path, 'rb')))
+                if not len(reader.pages):
+                    raise ValueError("PDF has no pages")
+                merger.append(reader)
+                merged.append(label)
+            except Exception as e:
+                logger.warning(f"Skipping PDF {label} due to error: {e}")
 
-        if not successful_urls:
+        if not merged:
             raise Exception("No valid PDFs to merge.")
 
-        # Write merged PDF to memory
-        merged_pdf_bytes = io.BytesIO()
-        merger.write(merged_pdf_bytes)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f'{full_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            merger.write(f)
         merger.close()
-        merged_pdf_bytes.seek(0)
+        os.replace(tmp_path, full_path)
+    return merged
 
-        # Generate filename + path
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_name = f'merged_{timestamp}.pdf'
-        relative_path = os.path.join(save_folder, file_name)
-        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
 
-        # Ensure folder exists
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+def _media_url(request, relative_path):
+    return request.build_absolute_uri(os.path.join(settings.MEDIA_URL, relative_path))
 
-        # Save file locally
-        with open(full_path, "wb") as f:
-            f.write(merged_pdf_bytes.read())
 
-        # Build public URL
-        pdf_url = request.build_absolute_uri(
-            os.path.join(settings.MEDIA_URL, relative_path)
-        )
+def merge_pdfs_from_urls(pdf_urls, request, save_folder='merged_pdfs'):
+    sources = _fetch_sources(pdf_urls, request)
+    try:
+        # Generate filename + path
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        relative_path = os.path.join(save_folder, f'merged_{timestamp}.pdf')
+        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+
+        _write_merged([(url, path) for url, path, _ in sources], full_path)
 
+        pdf_url = _media_url(request, relative_path)
         logger.info(f"Merged PDF saved successfully at {pdf_url}")
         return pdf_url
 
     except Exception as e:
         logger.error(f"Error merging PDFs: {e}", exc_info=True)
         raise
+    finally:
+        for _, path, is_temp in sources:
+            if is_temp and path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def _file_hash(path):
+    """sha256 of a file, memoised in the cache by path, size and mtime."""
+    stat = os.stat(path)
+    key = hashlib.sha1(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()
+    cache_key = f'{HASH_CACHE_PREFIX}{key}'
+    digest = cache.get(cache_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        cache.set(cache_key, digest, timeout=None)
+    return digest
+
+
+class PDFsNotReady(Exception):
+    """Some quotations have no stored PDF yet; render jobs have been queued for them."""
+
+    def __init__(self, quotation_ids):
+        super().__init__(f"PDFs are still being rendered for quotations: {quotation_ids}")
+        self.quotation_ids = quotation_ids
+
+
+def _stored_pdf_path(quotation):
+    return _media_path(urlparse(quotation.file_url).path) if quotation.file_url else None
+
+
+def _render_pdf_path(quotation):
+    path, _ = render_quotation_pdf(
+        quotation,
+        quotation.created_by,
+        quotation_items_data(quotation),
+        terms=list(quotation.terms.values_list('id', flat=True)),
+    )
+    return path
+
+
+def merge_quotation_pdfs(quotation_ids, request, save_folder='merged_pdfs'):
+    """
+    Merges the stored PDFs of the given quotations, in the given order.
+    The output is named after the ordered content hashes of its sources,
+    so merging an unchanged bundle again returns the existing file.
+    Raises Quotation.DoesNotExist if any id is unknown. Quotations without
+    a stored PDF are queued for the background renderer and PDFsNotReady is
+    raised when PDF_RENDER_ASYNC is on; otherwise they are rendered here.
+    """
+    quotations = Quotation.objects.select_related('customer', 'created_by').in_bulk(quotation_ids)
+    missing = [qid for qid in quotation_ids if qid not in quotations]
+    if missing:
+        raise Quotation.DoesNotExist(f"Quotations not found: {missing}")
+
+    paths = {qid: _stored_pdf_path(quotations[qid]) for qid in quotation_ids}
+    not_ready = [qid for qid in quotation_ids if paths[qid] is None]
+    if not_ready and getattr(settings, 'PDF_RENDER_ASYNC', False):
+        enqueue_stored_quotation_pdfs(
+            [quotations[qid] for qid in not_ready], base_url=request.build_absolute_uri('/')
+        )
+        raise PDFsNotReady(not_ready)
+    for qid in not_ready:
+        paths[qid] = _render_pdf_path(quotations[qid])
+
+    sources = [(quotations[qid].quotation_number, paths[qid]) for qid in quotation_ids]
+    bundle_key = hashlib.sha256(
+        '\n'.join(_file_hash(path) for _, path in sources).encode('utf-8')
+    ).hexdigest()
+    relative_path = os.path.join(save_folder, f'bundle_{bundle_key[:32]}.pdf')
+    full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+
+    if os.path.exists(full_path):
+        metrics.incr(BUNDLE_HIT_COUNTER)
+    else:
+        metrics.incr(BUNDLE_MISS_COUNTER)
+        _write_merged(sources, full_path)
+    return _media_url(request, relative_path)
+
+
+def get_merge_cache_stats():
+    counters = metrics.get_counters([BUNDLE_HIT_COUNTER, BUNDLE_MISS_COUNTER])
+    hits, misses = counters[BUNDLE_HIT_COUNTER], counters[BUNDLE_MISS_COUNTER]
+    return {'hits': hits, 'misses': misses, 'hit_rate': metrics.hit_rate(hits, misses)}
 
 
 class MergePDFsAPIView(APIView):
@@ -91,3 +257,43 @@ class MergePDFsAPIView(APIView):
                 {"error": "Failed to merge PDFs", "details": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class MergeQuotationPDFsAPIView(APIView):
+    def post(self, request):
+        quotation_ids = request.data.get("quotation_ids")
+        if (
+            not quotation_ids
+            or not isinstance(quotation_ids, list)
+            or not all(isinstance(qid, int) and not isinstance(qid, bool) for qid in quotation_ids)
+        ):
+            return Response(
+                {"error": "quotation_ids must be a list of quotation IDs."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(set(quotation_ids)) != len(quotation_ids):
+            return Response(
+                {"error": "quotation_ids must not contain duplicates."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            merged_pdf_url = merge_quotation_pdfs(quotation_ids, request)
+            return Response({
+                "message": "PDFs merged successfully",
+                "final_url": merged_pdf_url,
+            }, status=status.HTTP_200_OK)
+
+        except Quotation.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PDFsNotReady as e:
+            return Response({
+                "message": "Some PDFs are still being rendered; try again shortly.",
+                "pending": e.quotation_ids,
+            }, status=status.HTTP_202_ACCEPTED)
+        except Exception as e:
+            logger.error(f"Failed to merge quotation PDFs: {e}", exc_info=True)
+            return Response(
+                {"error": "Failed to merge PDFs", "details": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -0,0 +1,42 @@
+# File: metrics.py
+
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import MetricCounter
+
+logger = logging.getLogger(__name__)
+
+
+def incr(name, delta=1):
+    """
+    Bumps a named counter. Counters live in the database and are bumped
+    with an atomic F() update, so every web and render_pdfs process adds
+    to the same exact total. Runs in its own savepoint and never raises.
+    """
+    try:
+        with transaction.atomic():
+            counters = MetricCounter.objects.filter(name=name)
+            if counters.update(value=F('value') + delta):
+                return
+            try:
+                with transaction.atomic():
+                    MetricCounter.objects.create(name=name, value=delta)
+            except IntegrityError:
+                # Another process created it between our update and insert.
+                counters.update(value=F('value') + delta)
+    except Exception:
+        logger.warning(f"Could not update metric {name}", exc_info=True)
+
+
+def get_counters(names):
+    """Returns {name: value} for the given counters, 0 for unseen ones."""
+    values = dict(MetricCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    return {name: values.get(name, 0) for name in names}
+
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0057_pdfrenderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_list',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='products/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='products/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_list',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='product_images/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='product_images/derivatives/'),
+        ),
+        migrations.AddField(
+            model_name='signatureimage',
+            name='image_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='signatures/derivatives/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0059_pdfrenderbatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quotation',
+            name='quotations__created_8ecbbd_idx',
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['created_at', 'id'], name='quotations__created_24e5fa_idx'),
+        ),
+    ]
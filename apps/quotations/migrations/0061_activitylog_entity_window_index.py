@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0060_quotation_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='activitylog',
+            name='quotations__entity__15d2f1_idx',
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='quotations__entity__f5b55c_idx'),
+        ),
+    ]
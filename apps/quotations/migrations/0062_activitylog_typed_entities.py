@@ -0,0 +1,74 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0061_activitylog_entity_window_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('LOGIN', 'User Login'), ('LOGOUT', 'User Logout'), ('PASSWORD_CHANGE', 'Password Changed'), ('CUSTOMER_CREATED', 'Customer Created'), ('CUSTOMER_UPDATED', 'Customer Updated'), ('LEAD_CREATED', 'Lead Created'), ('LEAD_UPDATED', 'Lead Updated'), ('LEAD_ASSIGNED', 'Lead Assigned'), ('LEAD_STATUS_CHANGED', 'Lead Status Changed'), ('QUOTATION_CREATED', 'Quotation Created'), ('QUOTATION_UPDATED', 'Quotation Updated'), ('QUOTATION_STATUS_CHANGED', 'Quotation Status Changed'), ('QUOTATION_SENT', 'Quotation Sent'), ('QUOTATION_VIEWED', 'Quotation Viewed by Customer'), ('PRODUCT_CREATED', 'Product Created'), ('PRODUCT_UPDATED', 'Product Updated'), ('SYSTEM_NOTIFICATION', 'System Notification')], max_length=50)),
+                ('entity_type', models.CharField(max_length=50)),
+                ('entity_id', models.CharField(max_length=50)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='lead',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_logs', to='quotations.lead'),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='quotation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_logs', to='quotations.quotation'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['quotation', 'created_at'], name='quotations__quotati_3267a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['lead', 'created_at'], name='quotations__lead_id_a24d2c_idx'),
+        ),
+        migrations.AddField(
+            model_name='activitylogarchive',
+            name='actor',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='activitylogarchive',
+            name='customer',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='quotations.customer'),
+        ),
+        migrations.AddField(
+            model_name='activitylogarchive',
+            name='lead',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='quotations.lead'),
+        ),
+        migrations.AddField(
+            model_name='activitylogarchive',
+            name='quotation',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='quotations.quotation'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylogarchive',
+            index=models.Index(fields=['created_at'], name='quotations__created_f5b17f_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+
+def backfill_typed_entities(apps, schema_editor):
+    ActivityLog = apps.get_model('quotations', 'ActivityLog')
+    for entity_type, model_name, field in (('Quotation', 'Quotation', 'quotation'), ('Lead', 'Lead', 'lead')):
+        Model = apps.get_model('quotations', model_name)
+        # Only ids that still exist, so the FK never points at a deleted row.
+        existing_ids = Model.objects.annotate(
+            str_id=Cast('id', models.CharField(max_length=50))
+        ).values('str_id')
+        ActivityLog.objects.filter(
+            entity_type=entity_type, entity_id__in=existing_ids
+        ).update(**{f'{field}_id': Cast('entity_id', models.BigIntegerField())})
+
+
+def clear_typed_entities(apps, schema_editor):
+    ActivityLog = apps.get_model('quotations', 'ActivityLog')
+    ActivityLog.objects.update(quotation=None, lead=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0062_activitylog_typed_entities'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_typed_entities, clear_typed_entities),
+    ]
@@ -0,0 +1,61 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_ids_to_foreign_keys(apps, schema_editor):
+    Lead = apps.get_model('quotations', 'Lead')
+    Quotation = apps.get_model('quotations', 'Quotation')
+
+    # Ids that point at deleted rows are dropped rather than copied, since
+    # the new columns are real foreign keys.
+    quotation_ids = Quotation.objects.values('id')
+    Lead.objects.filter(quotation_id__in=quotation_ids).update(quotation_fk_id=models.F('quotation_id'))
+
+    lead_ids = Lead.objects.values('id')
+    Quotation.objects.filter(lead_id__in=lead_ids).update(lead_fk_id=models.F('lead_id'))
+
+
+def copy_foreign_keys_to_ids(apps, schema_editor):
+    Lead = apps.get_model('quotations', 'Lead')
+    Quotation = apps.get_model('quotations', 'Quotation')
+    Lead.objects.update(quotation_id=models.F('quotation_fk_id'))
+    Quotation.objects.update(lead_id=models.F('lead_fk_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0063_backfill_activitylog_entities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='quotation_fk',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_for_leads', to='quotations.quotation'),
+        ),
+        migrations.AddField(
+            model_name='quotation',
+            name='lead_fk',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quotations', to='quotations.lead'),
+        ),
+        migrations.RunPython(copy_ids_to_foreign_keys, copy_foreign_keys_to_ids),
+        migrations.RemoveField(
+            model_name='lead',
+            name='quotation_id',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='lead_id',
+        ),
+        migrations.RenameField(
+            model_name='lead',
+            old_name='quotation_fk',
+            new_name='quotation',
+        ),
+        migrations.RenameField(
+            model_name='quotation',
+            old_name='lead_fk',
+            new_name='lead',
+        ),
+    ]
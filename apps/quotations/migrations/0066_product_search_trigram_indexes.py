@@ -0,0 +1,39 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# (index, table, column) for the ILIKE / trigram lookups used by search.py.
+TRIGRAM_INDEXES = [
+    ('quotations_product_name_trgm', 'quotations_product', 'name'),
+    ('quotations_product_brand_trgm', 'quotations_product', 'brand'),
+    ('quotations_product_description_trgm', 'quotations_product', 'description'),
+    ('quotations_category_name_trgm', 'quotations_category', 'name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes only exist on PostgreSQL; other backends scan.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0065_product_updated_at'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# (index, table, column) for the ILIKE / trigram lookups used by search.py.
+TRIGRAM_INDEXES = [
+    ('quotations_customer_name_trgm', 'quotations_customer', 'name'),
+    ('quotations_customer_company_name_trgm', 'quotations_customer', 'company_name'),
+    ('quotations_customer_phone_trgm', 'quotations_customer', 'phone'),
+    ('quotations_customer_email_trgm', 'quotations_customer', 'email'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes only exist on PostgreSQL; other backends scan.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0066_product_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
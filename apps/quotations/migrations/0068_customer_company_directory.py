@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_company_directory(apps, schema_editor):
+    Customer = apps.get_model('quotations', 'Customer')
+    CustomerCompany = apps.get_model('quotations', 'CustomerCompany')
+    companies = {}
+    rows = (
+        Customer.objects.exclude(company_name='').values('company_name')
+        .annotate(count=Count('id')).order_by('company_name')
+    )
+    for row in rows:
+        name = ' '.join(row['company_name'].split())
+        key = name.casefold()
+        if not key:
+            continue
+        entry = companies.setdefault(key, CustomerCompany(normalized_name=key, name=name, customer_count=0))
+        entry.customer_count += row['count']
+    CustomerCompany.objects.bulk_create(companies.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0067_customer_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerCompany',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(max_length=255, unique=True)),
+                ('customer_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['normalized_name'], name='customer_company_prefix_idx', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+        migrations.RunPython(build_company_directory, migrations.RunPython.noop),
+    ]
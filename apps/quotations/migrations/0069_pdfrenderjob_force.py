@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0068_customer_company_directory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfrenderjob',
+            name='force',
+            field=models.BooleanField(default=False),
+        ),
+    ]
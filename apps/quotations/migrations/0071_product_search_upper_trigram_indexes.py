@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# On PostgreSQL, Django renders __icontains as UPPER("col"::text) LIKE UPPER(%s),
+# so the trigram indexes have to be built on that expression to serve it. The
+# plain index on product name stays for the `%>` word-similarity lookup.
+UPPER_TRIGRAM_INDEXES = [
+    ('quotations_product_name_upper_trgm', 'quotations_product', 'name'),
+    ('quotations_product_brand_upper_trgm', 'quotations_product', 'brand'),
+    ('quotations_product_description_upper_trgm', 'quotations_product', 'description'),
+    ('quotations_category_name_upper_trgm', 'quotations_category', 'name'),
+]
+
+# Plain column indexes from 0066 that no search lookup uses.
+UNUSED_TRIGRAM_INDEXES = [
+    ('quotations_product_brand_trgm', 'quotations_product', 'brand'),
+    ('quotations_product_description_trgm', 'quotations_product', 'description'),
+    ('quotations_category_name_trgm', 'quotations_category', 'name'),
+]
+
+
+def create_upper_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in UNUSED_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, table, column in UPPER_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_upper_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in UPPER_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, table, column in UNUSED_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0070_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_trigram_indexes, drop_upper_trigram_indexes),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Same fix as 0071 for the customer indexes from 0067: __icontains runs as
+# UPPER("col"::text) LIKE UPPER(%s), so the indexes are built on that. Phone
+# fragments are matched against search.PhoneDigits, so the phone digits get
+# their own index on that exact expression. The plain name index stays for `%>`.
+UPPER_TRIGRAM_INDEXES = [
+    ('quotations_customer_name_upper_trgm', 'quotations_customer', 'UPPER(name::text)'),
+    ('quotations_customer_company_name_upper_trgm', 'quotations_customer', 'UPPER(company_name::text)'),
+    ('quotations_customer_phone_upper_trgm', 'quotations_customer', 'UPPER(phone::text)'),
+    ('quotations_customer_email_upper_trgm', 'quotations_customer', 'UPPER(email::text)'),
+    (
+        'quotations_customer_phone_digits_trgm', 'quotations_customer',
+        "UPPER(REGEXP_REPLACE(phone, '[^0-9]', '', 'g')::text)",
+    ),
+]
+
+# Plain column indexes from 0067 that no search lookup uses.
+UNUSED_TRIGRAM_INDEXES = [
+    ('quotations_customer_company_name_trgm', 'quotations_customer', 'company_name'),
+    ('quotations_customer_phone_trgm', 'quotations_customer', 'phone'),
+    ('quotations_customer_email_trgm', 'quotations_customer', 'email'),
+]
+
+
+def create_upper_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in UNUSED_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, table, expression in UPPER_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({expression}) gin_trgm_ops)'
+        )
+
+
+def drop_upper_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in UPPER_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, table, column in UNUSED_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0071_product_search_upper_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_trigram_indexes, drop_upper_trigram_indexes),
+    ]
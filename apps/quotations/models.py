@@ -1,21 +1,36 @@
 from decimal import Decimal
 from django.conf import settings
 from django.db import models, transaction
-from django.db.models import Count, Q
+from django.db.models import Count, Q, F, Window
+from django.db.models.functions import Greatest, RowNumber
 from django.utils import timezone
-from .choices import LeadStatus, QuotationStatus, ActivityAction,CATEGORY_CHOICES,UNIT_CHOICES,LeadPriority,LeadSource
+from .choices import LeadStatus, QuotationStatus, ActivityAction,CATEGORY_CHOICES,UNIT_CHOICES,LeadPriority,LeadSource,PDFJobStatus
 from apps.quotations.utils import generate_next_quotation_number,create_next_lead_number
 User = settings.AUTH_USER_MODEL
 from crum import get_current_user
 from apps.accounts.models import User,Roles
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from apps.accounts.models import User,Roles
 from .permissions import PERMISSIONS_MAP
+from .activity_buffer import current_buffer
 def get_default_permissions():
     return PERMISSIONS_MAP.copy()
 
-class TimestampedModel(models.Model):
+class TouchOnSaveMixin:
+    """
+    Partial saves (update_fields) still bump updated_at: the list ETags
+    (see conditional.py) rely on it to notice edited rows.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'updated_at']
+        super().save(*args, **kwargs)
+
+
+class TimestampedModel(TouchOnSaveMixin, models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,14 +71,82 @@ class Customer(TimestampedModel):
 
     def __str__(self):
         return f"{self.name} ({self.company_name})" if self.company_name else self.name
-class Category(models.Model):
+
+
+def normalize_company_name(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+class CustomerCompany(TimestampedModel):
+    """
+    One row per distinct customer company_name (compared case- and
+    whitespace-insensitively), with how many customers use it. Kept in step
+    by the Customer signals below so CompanyListView never scans customers.
+    """
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, unique=True)
+    customer_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['normalized_name'], name='customer_company_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def adjust(cls, name, delta):
+        """Adds `delta` customers to the company `name`, creating it if needed."""
+        key = normalize_company_name(name)
+        if not key:
+            return
+        if delta > 0:
+            entry, created = cls.objects.get_or_create(
+                normalized_name=key, defaults={'name': ' '.join(name.split()), 'customer_count': delta}
+            )
+            if created:
+                return
+        cls.objects.filter(normalized_name=key).update(
+            customer_count=Greatest(F('customer_count') + delta, 0), updated_at=timezone.now()
+        )
+
+
+@receiver(pre_save, sender=Customer)
+def remember_company_name(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and 'company_name' not in update_fields):
+        instance._previous_company_name = None
+        return
+    instance._previous_company_name = (
+        Customer.objects.filter(pk=instance.pk).values_list('company_name', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Customer)
+def update_company_directory(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        CustomerCompany.adjust(instance.company_name, 1)
+        return
+    if update_fields is not None and 'company_name' not in update_fields:
+        return
+    previous = getattr(instance, '_previous_company_name', None)
+    if normalize_company_name(previous) != normalize_company_name(instance.company_name):
+        CustomerCompany.adjust(previous, -1)
+        CustomerCompany.adjust(instance.company_name, 1)
+
+
+@receiver(post_delete, sender=Customer)
+def remove_from_company_directory(sender, instance, **kwargs):
+    CustomerCompany.adjust(instance.company_name, -1)
+class Category(TouchOnSaveMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     def __str__(self):
         return self.name
 
-class Product(models.Model):
+class Product(TouchOnSaveMixin, models.Model):
     name = models.CharField(max_length=255) 
     description = models.TextField(blank=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
@@ -78,7 +161,10 @@ class Product(models.Model):
     discount = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'), null=True, blank=True)  # %
     active = models.BooleanField(default=True,null=True,blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
     image = models.ImageField(upload_to='products/', null=True, blank=True)
+    image_pdf = models.ImageField(upload_to='products/derivatives/', null=True, blank=True, editable=False)
+    image_list = models.ImageField(upload_to='products/derivatives/', null=True, blank=True, editable=False)
 
     
     class Meta:
@@ -123,7 +209,10 @@ class Lead(TimestampedModel):
     created_by = models.ForeignKey(
         "accounts.User", on_delete=models.SET_NULL, null=True, related_name="leads_created"
     )
-    quotation_id = models.IntegerField(null=True, blank=True)
+    # The lead's current quotation (the latest revision).
+    quotation = models.ForeignKey(
+        "Quotation", on_delete=models.SET_NULL, null=True, blank=True, related_name="current_for_leads"
+    )
     
 
     class Meta:
@@ -198,7 +287,7 @@ class Quotation(TimestampedModel):
     additional_charge_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), blank=True, null=True)
     discount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), blank=True, null=True)
     emailed_at = models.DateTimeField(null=True, blank=True)
-    lead_id = models.IntegerField(null=True, blank=True)
+    lead = models.ForeignKey(Lead, on_delete=models.SET_NULL, null=True, blank=True, related_name="quotations")
     has_pdf = models.BooleanField(default=False)
     file_url = models.URLField(blank=True)
     additionalNotes = models.TextField(blank=True,null=True)
@@ -211,7 +300,8 @@ class Quotation(TimestampedModel):
             models.Index(fields=["quotation_number"]),
             models.Index(fields=["status"]),
             models.Index(fields=["follow_up_date"]),
-            models.Index(fields=["created_at"]),
+            # Serves both created_at lookups and the (created_at, id) keyset.
+            models.Index(fields=["created_at", "id"]),
         ]
         ordering = ["-created_at"]
 
@@ -245,6 +335,62 @@ class ProductDetails(TimestampedModel):
         return f"{self.product.name} x {self.quantity}"
 
 
+class PDFRenderBatch(TimestampedModel):
+    """
+    A bulk re-render of every quotation matching `filters`. Its jobs double as
+    the checkpoint: resuming only re-queues the ones that did not finish.
+    """
+    requested_by = models.ForeignKey(
+        "accounts.User", on_delete=models.SET_NULL, null=True, blank=True, related_name="pdf_batches"
+    )
+    filters = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"PDF batch {self.id} ({self.total} quotations)"
+
+
+class PDFRenderJob(TimestampedModel):
+    """
+    A queued PDF build for a quotation. Jobs are picked up by the
+    `render_pdfs` management command so create/revise requests never
+    wait on ReportLab.
+    """
+    quotation = models.ForeignKey(Quotation, on_delete=models.CASCADE, related_name='pdf_jobs')
+    batch = models.ForeignKey(
+        PDFRenderBatch, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs'
+    )
+    requested_by = models.ForeignKey(
+        "accounts.User", on_delete=models.SET_NULL, null=True, blank=True, related_name="pdf_jobs"
+    )
+    status = models.CharField(max_length=20, choices=PDFJobStatus.choices, default=PDFJobStatus.PENDING)
+    items_data = models.JSONField(default=list, blank=True)
+    terms = models.JSONField(default=list, blank=True)
+    base_url = models.CharField(max_length=255, blank=True)
+    send_email = models.BooleanField(default=False)
+    # Rebuild even when a stored PDF with the same fingerprint exists.
+    force = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"PDF job {self.id} for Quotation {self.quotation_id} ({self.status})"
+
+
+class MetricCounter(models.Model):
+    """A named counter shared by every process, bumped with F() updates (see metrics.py)."""
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
 class EmailLog(TimestampedModel):
     to_email = models.EmailField()
     subject = models.CharField(max_length=255)
@@ -270,15 +416,27 @@ class EmailLog(TimestampedModel):
 class ActivityLog(TimestampedModel):
     actor = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_logs')
     customer = models.ForeignKey(Customer,on_delete=models.SET_NULL,null=True,blank=True,related_name='activity_logs')
+    # Typed links for the entities we list and join on; entity_type/entity_id
+    # stay as the generic record for every other entity.
+    quotation = models.ForeignKey(Quotation, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_logs')
+    lead = models.ForeignKey(Lead, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_logs')
     action = models.CharField(max_length=50, choices=ActivityAction.choices)
     entity_type = models.CharField(max_length=50)
     entity_id = models.CharField(max_length=50)
     message = models.TextField(blank=True)  
+    # Set when the entry is built rather than on insert, so logs written in
+    # bulk by buffered_activity_logs() keep the time the change happened.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    TYPED_ENTITIES = {'Quotation': 'quotation', 'Lead': 'lead'}
 
     class Meta:
         indexes = [
             models.Index(fields=['action']),
-            models.Index(fields=['entity_type', 'entity_id']),
+            models.Index(fields=['entity_type', 'entity_id', 'created_at']),
+            # Serve the per-entity newest-first window.
+            models.Index(fields=['quotation', 'created_at']),
+            models.Index(fields=['lead', 'created_at']),
             models.Index(fields=['created_at']),
         ]
         ordering = ['-created_at']
@@ -288,15 +446,99 @@ class ActivityLog(TimestampedModel):
 
     @classmethod
     def log(cls, actor, action, entity, customer ,message=''):
-        return cls.objects.create(
+        entry = cls(
             actor=actor,
             action=action,
             entity_type=entity.__class__.__name__,
             entity_id=str(getattr(entity, 'id', '')),
+            quotation=entity if isinstance(entity, Quotation) else None,
+            lead=entity if isinstance(entity, Lead) else None,
             message=message,
             customer = customer,
         )
-    
+        # Inside buffered_activity_logs() the row is written in bulk on commit.
+        buffer = current_buffer()
+        if buffer is not None:
+            buffer.add(entry)
+        else:
+            entry.save()
+        return entry
+
+    @classmethod
+    def latest_for(cls, entity_type, entity_ids, limit=10):
+        """
+        Returns {entity_id: [logs, newest first]} with at most `limit` logs per
+        Quotation or Lead. The top-N cut is made in SQL with ROW_NUMBER() so
+        long log histories are never loaded.
+        """
+        field = cls.TYPED_ENTITIES[entity_type]
+        ids = set(entity_ids)
+        if not ids:
+            return {}
+        logs = cls.objects.filter(
+            **{f'{field}_id__in': ids}
+        ).annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F(field)],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        ).filter(row_number__lte=limit).select_related('actor').order_by('-created_at', '-id')
+
+        grouped = {}
+        for log in logs:
+            grouped.setdefault(getattr(log, f'{field}_id'), []).append(log)
+        return grouped
+
+
+class ActivityLogArchive(models.Model):
+    """
+    Activity logs moved out of the live table by `archive_activity_logs`.
+    Rows keep their original id and timestamps; relations are unconstrained
+    so archived history survives deletes without cascading into it.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    actor = models.ForeignKey('accounts.User', on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+')
+    customer = models.ForeignKey(Customer, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+')
+    quotation = models.ForeignKey(Quotation, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+')
+    lead = models.ForeignKey(Lead, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+')
+    action = models.CharField(max_length=50, choices=ActivityAction.choices)
+    entity_type = models.CharField(max_length=50)
+    entity_id = models.CharField(max_length=50)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+        ordering = ['-created_at']
+
+    ARCHIVED_FIELDS = (
+        'id', 'actor_id', 'customer_id', 'quotation_id', 'lead_id', 'action',
+        'entity_type', 'entity_id', 'message', 'created_at', 'updated_at',
+    )
+
+    @classmethod
+    def archive_before(cls, cutoff, batch_size=1000):
+        """
+        Moves logs created before `cutoff` into the archive, one batch per
+        transaction, and returns how many rows were moved.
+        """
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    ActivityLog.objects.filter(created_at__lt=cutoff)
+                    .order_by('id')
+                    .values(*cls.ARCHIVED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    return moved
+                cls.objects.bulk_create([cls(**row) for row in rows], ignore_conflicts=True)
+                ActivityLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            moved += len(rows)
+
 class SalespersonPermission(models.Model):
     user = models.OneToOneField(
         User,
@@ -323,6 +565,8 @@ class ProductImage(TimestampedModel):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     quotation = models.ForeignKey(Quotation, on_delete=models.SET_NULL, null=True, blank=True, related_name='product_images')
     image = models.ImageField(upload_to='product_images/')
+    image_pdf = models.ImageField(upload_to='product_images/derivatives/', null=True, blank=True, editable=False)
+    image_list = models.ImageField(upload_to='product_images/derivatives/', null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Image for {self.product.name}"
@@ -330,6 +574,7 @@ class ProductImage(TimestampedModel):
 class SignatureImage(TimestampedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='signature')
     image = models.ImageField(upload_to='signatures/')
+    image_pdf = models.ImageField(upload_to='signatures/derivatives/', null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Signature for User {self.user.get_full_name()}"
\ No newline at end of file
@@ -0,0 +1,106 @@
+# File: pagination.py
+
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .serialization import dumps
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidPageRequest("Invalid cursor.")
+
+
+def page_size(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    value = request.GET.get('limit')
+    if not value:
+        return default
+    try:
+        size = int(value)
+    except ValueError:
+        raise InvalidPageRequest("limit must be an integer.")
+    if size < 1:
+        raise InvalidPageRequest("limit must be positive.")
+    return min(size, maximum)
+
+
+def page_offset(request):
+    value = request.GET.get('offset')
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise InvalidPageRequest("offset must be a non-negative integer.")
+    return int(value)
+
+
+def keyset_page(queryset, request, default=DEFAULT_PAGE_SIZE, key=None):
+    """
+    Newest-first page of `queryset` keyed on (created_at, id). The client
+    passes back `next_cursor` as `?cursor=` to get the following page, so
+    each page costs the same no matter how deep it is. For values_list()
+    querysets, `key` returns (created_at, id) for a row.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    size = page_size(request, default)
+    queryset = queryset.order_by('-created_at', '-id')
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    rows = list(queryset[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(*key(last)) if key else encode_cursor(last.created_at, last.pk)
+    return rows, next_cursor
+
+
+def requested_fields(request, available, always=('id',), param='fields'):
+    """Parses `?fields=a,b` against the available names; None means all."""
+    value = request.GET.get(param)
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise InvalidPageRequest(f"Unknown {param}: {', '.join(unknown)}")
+    return set(fields) | set(always)
+
+
+def stream_json_page(rows, next_cursor, serialize):
+    """
+    Yields `{"data": [...], "next_cursor": ...}` one serialized row at a
+    time, for use as a StreamingHttpResponse body.
+    """
+    yield b'{"data":['
+    for index, row in enumerate(rows):
+        if index:
+            yield b','
+        yield dumps(serialize(row))
+    yield b'],"next_cursor":' + dumps(next_cursor) + b'}'
@@ -0,0 +1,104 @@
+# File: pdf_assets.py
+
+import os
+import threading
+from types import SimpleNamespace
+
+from django.contrib.staticfiles import finders
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.utils import ImageReader
+
+LETTERHEAD_LOGOS = {
+    'godrej': 'quotations/assets/godrej.jpeg',
+    'eureka': 'quotations/assets/eureka.jpeg',
+    'carysil': 'quotations/assets/carysil.jpeg',
+}
+
+PRIMARY_BLUE = colors.Color(37/255, 99/255, 235/255)
+LIGHT_GRAY = colors.Color(249/255, 250/255, 251/255)
+DARK_GRAY = colors.Color(55/255, 65/255, 81/255)
+MEDIUM_GRAY = colors.Color(75/255, 85/255, 99/255)
+BORDER_GRAY = colors.Color(209/255, 213/255, 219/255)
+SEPARATOR_GRAY = colors.Color(220/255, 38/255, 38/255)
+HEADER_BLUE = colors.Color(0/255, 51/255, 102/255)
+
+# Shared by every QuotationPDFGenerator in this process. Image readers are
+# reloaded when the file's mtime changes; styles never change at runtime.
+_lock = threading.RLock()
+_static_paths = {}
+_image_readers = {}
+_styles = None
+
+
+def _find_static(name):
+    path = _static_paths.get(name)
+    if path is None:
+        path = finders.find(name)
+        if path:
+            _static_paths[name] = path
+    return path
+
+
+def get_image_reader(static_name):
+    """Returns a cached ImageReader for a static file, or None if it can't be loaded."""
+    with _lock:
+        path = _find_static(static_name)
+        if not path:
+            return None
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            _image_readers.pop(path, None)
+            _static_paths.pop(static_name, None)
+            return None
+
+        cached = _image_readers.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            reader = ImageReader(path)
+        except Exception:
+            reader = None
+        _image_readers[path] = (mtime, reader)
+        return reader
+
+
+def get_logo(key):
+    return get_image_reader(LETTERHEAD_LOGOS[key])
+
+
+def _build_styles():
+    sample = getSampleStyleSheet()
+    return SimpleNamespace(
+        sample=sample,
+        title=ParagraphStyle('Title', parent=sample['Heading1'], fontSize=16, fontName='Helvetica-Bold', spaceAfter=14, alignment=TA_CENTER, textColor=DARK_GRAY),
+        section_heading=ParagraphStyle('SectionHeading', parent=sample['Heading2'], fontSize=14, fontName='Helvetica-Bold', spaceAfter=12, spaceBefore=16, textColor=colors.black),
+        normal=ParagraphStyle('Normal', parent=sample['Normal'], fontSize=10, textColor=DARK_GRAY, leading=14),
+        right=ParagraphStyle('Right', parent=sample['Normal'], fontSize=10, alignment=TA_RIGHT, textColor=DARK_GRAY),
+        terms_heading=ParagraphStyle('TermsHeading', parent=sample['Heading3'], fontSize=11, fontName='Helvetica-Bold', spaceAfter=6, spaceBefore=6, textColor=colors.black),
+        terms_content=ParagraphStyle('TermsContent', parent=sample['Normal'], fontSize=9, spaceAfter=6, textColor=DARK_GRAY, leading=12),
+        footer=ParagraphStyle('Footer', parent=sample['Normal'], fontSize=8, alignment=TA_CENTER, textColor=MEDIUM_GRAY),
+        total_value=ParagraphStyle('TotalVal', parent=sample['Normal'], fontSize=10, alignment=TA_RIGHT, textColor=DARK_GRAY),
+        grand_total=ParagraphStyle('GrandTotal', parent=sample['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=PRIMARY_BLUE),
+        total_label=ParagraphStyle('TotalLabel', parent=sample['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=DARK_GRAY),
+        grand_label=ParagraphStyle('GrandLabel', parent=sample['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=PRIMARY_BLUE),
+    )
+
+
+def get_styles():
+    global _styles
+    if _styles is None:
+        with _lock:
+            if _styles is None:
+                _styles = _build_styles()
+    return _styles
+
+
+def warm_up():
+    """Loads the letterhead logos and styles so the first PDF pays nothing extra."""
+    for key in LETTERHEAD_LOGOS:
+        get_logo(key)
+    get_styles()
@@ -0,0 +1,136 @@
+# File: pdf_cache.py
+
+import hashlib
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.staticfiles import finders
+
+from .models import TermsAndConditions
+from .pdf_assets import LETTERHEAD_LOGOS
+from . import metrics
+
+# Bump whenever QuotationPDFGenerator's layout changes so stored PDFs built
+# by the old layout stop matching.
+PDF_LAYOUT_VERSION = 3
+
+HIT_COUNTER = 'pdf_cache.hits'
+MISS_COUNTER = 'pdf_cache.misses'
+
+
+def _letterhead_digest():
+    digest = hashlib.sha256()
+    for key, name in sorted(LETTERHEAD_LOGOS.items()):
+        digest.update(key.encode('utf-8'))
+        path = finders.find(name)
+        if path:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Hashed once per process: replacing a letterhead image takes a restart
+# (i.e. a deploy) to reach the fingerprints, and then invalidates them all.
+LETTERHEAD_DIGEST = _letterhead_digest()
+
+
+def _normalize_number(value):
+    # Request payloads send 0, "0" or "0.00" for the same amount.
+    try:
+        return str(Decimal(str(value if value not in (None, '') else 0)).quantize(Decimal('0.01')))
+    except (InvalidOperation, ValueError):
+        return str(value)
+
+
+def _resolve_terms(quotation, terms):
+    term_ids = [int(t) for t in (terms or [])]
+    if term_ids:
+        qs = TermsAndConditions.objects.filter(id__in=term_ids)
+    elif quotation.pk:
+        qs = quotation.terms.all()
+    else:
+        return []
+    return list(qs.order_by('id').values_list('id', 'title', 'content_html'))
+
+
+def quotation_pdf_fingerprint(quotation, user, items, terms=None, signature=None):
+    """
+    Stable hash of everything QuotationPDFGenerator reads: the quotation
+    totals and notes, the customer block, the enriched line items, the
+    terms text, the signature file, the creator's name and phone and the
+    letterhead images.
+    """
+    customer = quotation.customer
+    creator = None
+    if user is not None and user.is_authenticated:
+        creator = [user.get_full_name() or user.username, getattr(user, 'phone_number', '')]
+
+    payload = {
+        'layout': PDF_LAYOUT_VERSION,
+        'letterhead': LETTERHEAD_DIGEST,
+        'quotation': [
+            quotation.quotation_number,
+            quotation.created_at.date() if quotation.created_at else None,
+            quotation.discount,
+            quotation.discount_type,
+            quotation.additional_charge_name,
+            quotation.additional_charge_amount,
+            quotation.tax_rate,
+            quotation.is_tax_inclusive,
+            quotation.follow_up_date,
+            quotation.additionalNotes,
+        ],
+        'customer': [
+            customer.company_name,
+            customer.name,
+            customer.email,
+            customer.phone,
+            customer.primary_address,
+            customer.gst_number,
+        ],
+        'items': [
+            [
+                item['product']['id'],
+                _normalize_number(item.get('quantity', 1)),
+                _normalize_number(item.get('unit_price')),
+                item.get('description'),
+                _normalize_number(item.get('discount')),
+                item.get('image_path') or item.get('image_url'),
+            ]
+            for item in items
+        ],
+        'terms': _resolve_terms(quotation, terms),
+        'signature': signature,
+        'creator': creator,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def pdf_file_name(quotation, fingerprint):
+    return f'quotation_{quotation.quotation_number}_{fingerprint[:24]}.pdf'
+
+
+def lookup(file_path):
+    """Returns True (and counts a hit) when the rendered file already exists."""
+    if os.path.exists(file_path):
+        metrics.incr(HIT_COUNTER)
+        return True
+    metrics.incr(MISS_COUNTER)
+    return False
+
+
+def write_atomic(file_path, content):
+    """Writes via a temp file so readers never see a half-written PDF."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+
+def get_cache_stats():
+    counters = metrics.get_counters([HIT_COUNTER, MISS_COUNTER])
+    hits, misses = counters[HIT_COUNTER], counters[MISS_COUNTER]
+    return {'hits': hits, 'misses': misses, 'hit_rate': metrics.hit_rate(hits, misses)}
@@ -0,0 +1,203 @@
+# File: pdf_images.py
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+HIT_COUNTER = 'pdf_images.hits'
+MISS_COUNTER = 'pdf_images.misses'
+REVALIDATED_COUNTER = 'pdf_images.revalidated'
+TIMEOUT_COUNTER = 'pdf_images.timeouts'
+ERROR_COUNTER = 'pdf_images.errors'
+
+# Largest box any remote image is drawn into (the 40x20 mm signature) at 150 dpi.
+THUMBNAIL_MAX_PX = (240, 240)
+
+_session = None
+_session_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_session():
+    """One connection-pooled session per process, shared by all fetches."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                pool_size = _setting('PDF_IMAGE_FETCH_WORKERS', 8)
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _cache_dir():
+    path = _setting('PDF_IMAGE_CACHE_DIR', None) or os.path.join(tempfile.gettempdir(), 'qms_pdf_images')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    base = os.path.join(_cache_dir(), key)
+    return f'{base}.img', f'{base}.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _downscale(content):
+    """Shrinks the image to thumbnail size and returns encoded bytes."""
+    with Image.open(io.BytesIO(content)) as img:
+        img.thumbnail(THUMBNAIL_MAX_PX)
+        has_alpha = img.mode in ('RGBA', 'LA', 'P')
+        out = io.BytesIO()
+        if has_alpha:
+            img.save(out, format='PNG', optimize=True)
+        else:
+            img.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+        return out.getvalue()
+
+
+def _store(url, image_path, meta_path, content, etag):
+    thumb = _downscale(content)
+    tmp_path = f'{image_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(thumb)
+    os.replace(tmp_path, image_path)
+    with open(meta_path, 'w') as f:
+        json.dump({'url': url, 'etag': etag, 'fetched_at': time.time()}, f)
+    _evict_if_needed()
+
+
+def _evict_if_needed():
+    """Drops the least recently used thumbnails once the cache is over its limit."""
+    max_files = _setting('PDF_IMAGE_CACHE_MAX_FILES', 2000)
+    with _cache_lock:
+        cache_dir = _cache_dir()
+        images = [e for e in os.scandir(cache_dir) if e.name.endswith('.img')]
+        if len(images) <= max_files:
+            return
+        images.sort(key=lambda e: e.stat().st_mtime)
+        for entry in images[:len(images) - max_files]:
+            for path in (entry.path, entry.path[:-4] + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def fetch_image(url):
+    """
+    Returns (local path to a downscaled copy of `url` or None on failure,
+    the counter for the outcome). Fresh cache entries are used as-is; stale
+    ones are revalidated with their ETag so unchanged images are not
+    downloaded again. Runs in pool threads, so it leaves counting (a
+    database write) to the caller.
+    """
+    image_path, meta_path = _cache_paths(url)
+    meta = _read_meta(meta_path) if os.path.exists(image_path) else None
+    max_age = _setting('PDF_IMAGE_CACHE_MAX_AGE', 24 * 60 * 60)
+
+    if meta and time.time() - meta.get('fetched_at', 0) < max_age:
+        try:
+            os.utime(image_path)
+            return image_path, HIT_COUNTER
+        except OSError:
+            # Evicted between the existence check and now; fetch it again.
+            meta = None
+
+    headers = {}
+    if meta and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+
+    try:
+        resp = get_session().get(url, headers=headers, timeout=_setting('PDF_IMAGE_FETCH_TIMEOUT', 3))
+        if resp.status_code == 304 and meta:
+            meta['fetched_at'] = time.time()
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+            os.utime(image_path)
+            return image_path, REVALIDATED_COUNTER
+        resp.raise_for_status()
+        _store(url, image_path, meta_path, resp.content, resp.headers.get('ETag'))
+        return image_path, MISS_COUNTER
+    except requests.Timeout:
+        logger.warning(f"Timed out fetching PDF image {url}")
+        return None, TIMEOUT_COUNTER
+    except Exception as e:
+        logger.warning(f"Failed to fetch PDF image {url}: {e}")
+        return None, ERROR_COUNTER
+
+
+def prefetch_images(urls):
+    """
+    Fetches all remote images concurrently with a bounded pool and an overall
+    deadline. Returns {url: local_path_or_None}.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return {}
+
+    workers = min(len(urls), _setting('PDF_IMAGE_FETCH_WORKERS', 8))
+    deadline = _setting('PDF_IMAGE_FETCH_DEADLINE', 10)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {executor.submit(fetch_image, url): url for url in urls}
+    done, not_done = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    outcomes = Counter()
+    for future in done:
+        results[futures[future]], counter = future.result()
+        outcomes[counter] += 1
+    for future in not_done:
+        url = futures[future]
+        outcomes[TIMEOUT_COUNTER] += 1
+        logger.warning(f"PDF image fetch for {url} missed the {deadline}s deadline")
+        results[url] = None
+    for counter, count in outcomes.items():
+        metrics.incr(counter, count)
+    return results
+
+
+def get_fetch_stats():
+    counters = metrics.get_counters([
+        HIT_COUNTER, MISS_COUNTER, REVALIDATED_COUNTER, TIMEOUT_COUNTER, ERROR_COUNTER,
+    ])
+    hits = counters[HIT_COUNTER] + counters[REVALIDATED_COUNTER]
+    return {
+        'hits': counters[HIT_COUNTER],
+        'revalidated': counters[REVALIDATED_COUNTER],
+        'misses': counters[MISS_COUNTER],
+        'timeouts': counters[TIMEOUT_COUNTER],
+        'errors': counters[ERROR_COUNTER],
+        'hit_rate': metrics.hit_rate(hits, counters[MISS_COUNTER]),
+    }
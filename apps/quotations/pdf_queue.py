@@ -0,0 +1,304 @@
+# File: pdf_queue.py
+
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Prefetch
+from django.utils import timezone
+
+from .models import PDFRenderBatch, PDFRenderJob, ProductDetails, Quotation, ActivityLog
+from .choices import PDFJobStatus, ActivityAction, QuotationStatus
+from .save_quotation import render_quotation_pdf, quotation_items_data
+from .email_service import send_quotation_email
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_quotation_pdf(quotation, request, items_data, terms=None, send_email=False):
+    """
+    Queues a PDF build for the quotation. The job row is written in the caller's
+    transaction, so workers only see it once the quotation itself is committed.
+    """
+    user = getattr(request, 'user', None)
+    return PDFRenderJob.objects.create(
+        quotation=quotation,
+        requested_by=user if user is not None and user.is_authenticated else None,
+        items_data=items_data,
+        terms=list(terms or []),
+        base_url=request.build_absolute_uri('/'),
+        send_email=send_email,
+    )
+
+
+def _max_attempts():
+    return getattr(settings, 'PDF_RENDER_MAX_ATTEMPTS', 3)
+
+
+def _stale_cutoff():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'PDF_RENDER_STALE_SECONDS', 600))
+
+
+def enqueue_stored_quotation_pdfs(quotations, base_url=''):
+    """
+    Queues a render, as each quotation's creator, for the given quotations
+    from their stored items and terms, skipping those that already have a
+    job pending or running. Returns the queued jobs.
+    """
+    busy = set(
+        PDFRenderJob.objects.filter(
+            quotation__in=quotations, status__in=[PDFJobStatus.PENDING, PDFJobStatus.RUNNING]
+        ).values_list('quotation_id', flat=True)
+    )
+    return PDFRenderJob.objects.bulk_create([
+        PDFRenderJob(
+            quotation=quotation,
+            requested_by_id=quotation.created_by_id,
+            items_data=quotation_items_data(quotation),
+            terms=sorted(quotation.terms.values_list('id', flat=True)),
+            base_url=base_url,
+        )
+        for quotation in quotations
+        if quotation.pk not in busy
+    ])
+
+
+BATCH_FILTERS = ('date_from', 'date_to', 'status', 'salesperson')
+BATCH_CHUNK_SIZE = 500
+
+
+def _parse_batch_date(filters, key):
+    value = filters.get(key)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a date in YYYY-MM-DD format.")
+
+
+def clean_batch_filters(filters):
+    """Validates a batch filter dict, raising ValueError on bad input."""
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be an object.")
+    cleaned = {k: filters[k] for k in BATCH_FILTERS if filters.get(k) not in (None, '')}
+    for key in ('date_from', 'date_to'):
+        _parse_batch_date(cleaned, key)
+    if 'status' in cleaned and cleaned['status'] not in QuotationStatus.values:
+        raise ValueError(f"Invalid status '{cleaned['status']}'.")
+    if 'salesperson' in cleaned:
+        try:
+            cleaned['salesperson'] = int(cleaned['salesperson'])
+        except (TypeError, ValueError):
+            raise ValueError("salesperson must be a user id.")
+    return cleaned
+
+
+def batch_quotations(filters):
+    """Quotations matched by a cleaned batch filter."""
+    qs = Quotation.objects.all()
+    date_from = _parse_batch_date(filters, 'date_from')
+    date_to = _parse_batch_date(filters, 'date_to')
+    if date_from:
+        qs = qs.filter(created_at__date__gte=date_from)
+    if date_to:
+        qs = qs.filter(created_at__date__lte=date_to)
+    if filters.get('status'):
+        qs = qs.filter(status=filters['status'])
+    if filters.get('salesperson'):
+        qs = qs.filter(assigned_to_id=filters['salesperson'])
+    return qs
+
+
+def create_pdf_batch(filters, requested_by=None, base_url='', force=False):
+    """
+    Queues one render job per matching quotation. Jobs render as the
+    quotation's creator, like QuotationPDFView, so unchanged quotations
+    resolve to their existing stored file unless `force` is set.
+    """
+    filters = clean_batch_filters(filters)
+    quotations = (
+        batch_quotations(filters)
+        .order_by('id')
+        .prefetch_related(
+            Prefetch('details', queryset=ProductDetails.objects.order_by('id')),
+            'terms',
+        )
+    )
+
+    with transaction.atomic():
+        batch = PDFRenderBatch.objects.create(requested_by=requested_by, filters=filters)
+        jobs = []
+        total = 0
+        for quotation in quotations.iterator(chunk_size=BATCH_CHUNK_SIZE):
+            jobs.append(PDFRenderJob(
+                quotation=quotation,
+                batch=batch,
+                requested_by_id=quotation.created_by_id,
+                items_data=quotation_items_data(quotation),
+                terms=sorted(t.id for t in quotation.terms.all()),
+                base_url=base_url,
+                force=force,
+            ))
+            if len(jobs) >= BATCH_CHUNK_SIZE:
+                PDFRenderJob.objects.bulk_create(jobs)
+                total += len(jobs)
+                jobs = []
+        PDFRenderJob.objects.bulk_create(jobs)
+        batch.total = total + len(jobs)
+        batch.save(update_fields=['total', 'updated_at'])
+    return batch
+
+
+def resume_pdf_batch(batch):
+    """
+    Re-queues the batch's failed jobs, with fresh attempts, and any left
+    RUNNING for longer than PDF_RENDER_STALE_SECONDS by a worker that died.
+    Jobs still being rendered and finished jobs are kept, so a resumed batch
+    picks up where it stopped.
+    """
+    failed = batch.jobs.filter(status=PDFJobStatus.FAILED).update(
+        status=PDFJobStatus.PENDING, error='', attempts=0, started_at=None, finished_at=None,
+    )
+    stale = batch.jobs.filter(status=PDFJobStatus.RUNNING, started_at__lt=_stale_cutoff()).update(
+        status=PDFJobStatus.PENDING, error='', started_at=None, finished_at=None,
+    )
+    return failed + stale
+
+
+def batch_progress(batch):
+    counts = dict(
+        batch.jobs.values_list('status').annotate(n=Count('id')).order_by()
+    )
+    progress = {status.lower(): counts.get(status, 0) for status in PDFJobStatus.values}
+    finished = progress['done'] + progress['failed']
+    progress.update({
+        'total': batch.total,
+        'percent': round(100 * finished / batch.total, 1) if batch.total else 100.0,
+        'complete': finished >= batch.total,
+    })
+    return progress
+
+
+def reclaim_stale_pdf_jobs(batch_id=None):
+    """
+    Jobs RUNNING for longer than PDF_RENDER_STALE_SECONDS belong to a worker
+    that died. They go back to PENDING, or to FAILED once they are out of
+    attempts. Returns how many were reclaimed.
+    """
+    now = timezone.now()
+    stale = PDFRenderJob.objects.filter(status=PDFJobStatus.RUNNING, started_at__lt=_stale_cutoff())
+    if batch_id is not None:
+        stale = stale.filter(batch_id=batch_id)
+    requeued = stale.filter(attempts__lt=_max_attempts()).update(
+        status=PDFJobStatus.PENDING, started_at=None, updated_at=now,
+    )
+    failed = stale.update(
+        status=PDFJobStatus.FAILED,
+        error='The worker rendering this job stopped before it finished.',
+        finished_at=now,
+        updated_at=now,
+    )
+    if requeued or failed:
+        logger.warning(f"Reclaimed {requeued + failed} stale PDF job(s), {failed} out of attempts")
+    return requeued + failed
+
+
+def claim_pdf_jobs(limit, batch_id=None):
+    """
+    Marks up to `limit` pending jobs as RUNNING and returns their ids.
+    Rows locked by another worker are skipped rather than waited on, and
+    jobs queued by users go ahead of bulk re-renders. Stale RUNNING jobs
+    are reclaimed first.
+    """
+    reclaim_stale_pdf_jobs(batch_id)
+    with transaction.atomic():
+        pending = PDFRenderJob.objects.select_for_update(skip_locked=True).filter(status=PDFJobStatus.PENDING)
+        if batch_id is not None:
+            pending = pending.filter(batch_id=batch_id)
+        job_ids = list(
+            pending.order_by(F('batch').asc(nulls_first=True), 'created_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if job_ids:
+            PDFRenderJob.objects.filter(id__in=job_ids).update(
+                status=PDFJobStatus.RUNNING,
+                started_at=timezone.now(),
+                attempts=F('attempts') + 1,
+            )
+    return job_ids
+
+
+def _record_result(job, status, error=''):
+    # update() rather than save(): the row may already be gone with its quotation.
+    now = timezone.now()
+    job.status, job.error = status, error
+    job.finished_at = None if status == PDFJobStatus.PENDING else now
+    PDFRenderJob.objects.filter(pk=job.pk).update(
+        status=job.status, error=job.error, finished_at=job.finished_at, updated_at=now,
+    )
+
+
+def run_pdf_job(job_id):
+    """
+    Renders one claimed job and stores the result on its quotation. A
+    failed render goes back to the queue until the job has used
+    PDF_RENDER_MAX_ATTEMPTS. Returns the job's new status, or None when the
+    job was deleted (with its quotation) after it was claimed.
+    """
+    close_old_connections()
+    try:
+        job = PDFRenderJob.objects.select_related('quotation__customer', 'requested_by').get(pk=job_id)
+    except PDFRenderJob.DoesNotExist:
+        logger.info(f"PDF job {job_id} no longer exists, skipping it")
+        return None
+    quotation = job.quotation
+
+    try:
+        _, pdf_url = render_quotation_pdf(
+            quotation,
+            job.requested_by,
+            job.items_data,
+            terms=job.terms,
+            base_url=job.base_url,
+            force=job.force,
+        )
+    except Exception as e:
+        retry = job.attempts < _max_attempts()
+        logger.error(
+            f"PDF job {job.id} failed for Quotation {quotation.id} "
+            f"(attempt {job.attempts}{', will retry' if retry else ''}): {e}"
+        )
+        _record_result(job, PDFJobStatus.PENDING if retry else PDFJobStatus.FAILED, str(e)[:1000])
+        return job.status
+
+    with transaction.atomic():
+        # The quotation row lock orders jobs for the same quotation that finish
+        # together; an older job never replaces the file of a newer one.
+        locked = Quotation.objects.select_for_update().filter(pk=quotation.pk).values_list('pk', flat=True)
+        if not list(locked):
+            logger.info(f"Quotation {quotation.id} was deleted while PDF job {job.id} rendered it")
+            return None
+        superseded = PDFRenderJob.objects.filter(
+            quotation_id=quotation.pk, pk__gt=job.pk, status=PDFJobStatus.DONE,
+        ).exists()
+        if not superseded:
+            Quotation.objects.filter(pk=quotation.pk).update(file_url=pdf_url, has_pdf=True, updated_at=timezone.now())
+        _record_result(job, PDFJobStatus.DONE)
+
+    if job.send_email:
+        quotation.refresh_from_db()
+        try:
+            send_quotation_email(quotation)
+            ActivityLog.log(
+                actor=job.requested_by,
+                action=ActivityAction.QUOTATION_SENT,
+                entity=quotation,
+                message=f"Quotation {quotation.quotation_number} sent to customer.",
+                customer=quotation.customer,
+            )
+        except Exception as e:
+            logger.error(f"Failed to send email for Quotation {quotation.id}: {e}")
+
+    return job.status
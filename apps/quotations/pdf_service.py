@@ -2,7 +2,7 @@
 import io
 import re
 import os
-import requests
+import logging
 from reportlab.platypus import Image as RLImage, Table as RLTable, Paragraph, Spacer, KeepTogether
 from reportlab.lib.units import mm
 from reportlab.lib import colors
@@ -12,19 +12,22 @@ from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer,
     ListFlowable, ListItem, Frame, PageTemplate, NextPageTemplate
 )
 from reportlab.lib.units import mm
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-from reportlab.lib.utils import ImageReader
 from .models import TermsAndConditions as Term
-from django.contrib.staticfiles import finders
+from . import pdf_assets
+from .pdf_images import prefetch_images
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
 
 
 class QuotationPDFGenerator:
+    LETTERHEAD_FORM = 'QmsLetterhead'
+
     def __init__(self, quotation, items_data, user=None, company_profile=None, terms=None, signature=None):
         self.quotation = quotation
         self.items_data = items_data
@@ -32,13 +35,12 @@ class QuotationPDFGenerator:
         self.signature = signature
         self.company = company_profile
         self.terms = terms or []
-        self.styles = getSampleStyleSheet()
         self.buffer = io.BytesIO()
-        self._image_reader_cache = {}
+        self._remote_images = {}
 
-        self._godrej_logo = self._load_cached_image_reader(finders.find("quotations/assets/godrej.jpeg"))
-        self._eureka_logo = self._load_cached_image_reader(finders.find("quotations/assets/eureka.jpeg"))
-        self._carysil_logo = self._load_cached_image_reader(finders.find("quotations/assets/carysil.jpeg"))
+        self._godrej_logo = pdf_assets.get_logo('godrej')
+        self._eureka_logo = pdf_assets.get_logo('eureka')
+        self._carysil_logo = pdf_assets.get_logo('carysil')
 
         self.doc = SimpleDocTemplate(
             self.buffer,
@@ -49,27 +51,17 @@ class QuotationPDFGenerator:
             bottomMargin=50 * mm
         )
 
-        self.primary_blue = colors.Color(37/255, 99/255, 235/255)
-        self.light_gray = colors.Color(249/255, 250/255, 251/255)
-        self.dark_gray = colors.Color(55/255, 65/255, 81/255)
-        self.medium_gray = colors.Color(75/255, 85/255, 99/255)
-        self.border_gray = colors.Color(209/255, 213/255, 219/255)
-        self.separator_gray = colors.Color(220/255, 38/255, 38/255)
-        self.header_blue = colors.Color(0/255, 51/255, 102/255)
+        self.primary_blue = pdf_assets.PRIMARY_BLUE
+        self.light_gray = pdf_assets.LIGHT_GRAY
+        self.dark_gray = pdf_assets.DARK_GRAY
+        self.medium_gray = pdf_assets.MEDIUM_GRAY
+        self.border_gray = pdf_assets.BORDER_GRAY
+        self.separator_gray = pdf_assets.SEPARATOR_GRAY
+        self.header_blue = pdf_assets.HEADER_BLUE
 
         self._define_styles()
         self._setup_templates()
 
-    def _load_cached_image_reader(self, image_path):
-        if not image_path:
-            return None
-        if image_path not in self._image_reader_cache:
-            try:
-                self._image_reader_cache[image_path] = ImageReader(image_path)
-            except Exception:
-                self._image_reader_cache[image_path] = None
-        return self._image_reader_cache[image_path]
-
     def _setup_templates(self):
         """Setup page templates with consistent header/footer"""
         frame = Frame(self.doc.leftMargin, self.doc.bottomMargin, self.doc.width, self.doc.height, id='normal')
@@ -78,13 +70,22 @@ class QuotationPDFGenerator:
         self.doc.addPageTemplates([first_page_template, later_page_template])
 
     def _draw_header_footer(self, canvas, doc):
-        """Draw header and footer on every page"""
+        """Stamp the letterhead and this page's number on every page"""
+        self._ensure_letterhead_form(canvas)
         canvas.saveState()
-        self._draw_header(canvas)
-        self._draw_footer(canvas)
+        canvas.doForm(self.LETTERHEAD_FORM)
         self._add_page_number(canvas, doc)
         canvas.restoreState()
 
+    def _ensure_letterhead_form(self, canvas):
+        """Record the static header/footer once per document as a form XObject"""
+        if canvas.hasForm(self.LETTERHEAD_FORM):
+            return
+        canvas.beginForm(self.LETTERHEAD_FORM)
+        self._draw_header(canvas)
+        self._draw_footer(canvas)
+        canvas.endForm()
+
     def _draw_header(self, canvas):
         """Draw the exact header from letterhead"""
         page_width, page_height = A4
@@ -170,35 +171,44 @@ class QuotationPDFGenerator:
                     image_flowable.hAlign = 'LEFT'
                     elements.append(image_flowable)
                     elements.append(Spacer(1, 1.5 * mm))
-                elif str(image_source).startswith(('http://', 'https://')):
-                    resp = requests.get(image_source, timeout=1)
-                    resp.raise_for_status()
-                    img_io = io.BytesIO(resp.content)
-                    image_flowable = RLImage(img_io, width=max_img_w, height=max_img_h, kind='proportional')
+                elif self._remote_images.get(str(image_source)):
+                    image_flowable = RLImage(self._remote_images[str(image_source)], width=max_img_w, height=max_img_h, kind='proportional')
                     image_flowable.hAlign = 'LEFT'
                     elements.append(image_flowable)
                     elements.append(Spacer(1, 1.5 * mm))
-            except Exception:
-                pass
+            except Exception as e:
+                logger.warning(f"Skipping image {image_source} in quotation PDF: {e}")
 
         elements.append(Paragraph(description, self.normal_style))
         return elements
 
     def _define_styles(self):
-        """Define paragraph styles, keeping original styles"""
-        self.title_style = ParagraphStyle('Title', parent=self.styles['Heading1'], fontSize=16, fontName='Helvetica-Bold', spaceAfter=14, alignment=TA_CENTER, textColor=self.dark_gray)
-        self.section_heading_style = ParagraphStyle('SectionHeading', parent=self.styles['Heading2'], fontSize=14, fontName='Helvetica-Bold', spaceAfter=12, spaceBefore=16, textColor=colors.black)
-        self.normal_style = ParagraphStyle('Normal', parent=self.styles['Normal'], fontSize=10, textColor=self.dark_gray, leading=14)
-        self.right_style = ParagraphStyle('Right', parent=self.styles['Normal'], fontSize=10, alignment=TA_RIGHT, textColor=self.dark_gray)
-        self.terms_heading_style = ParagraphStyle('TermsHeading', parent=self.styles['Heading3'], fontSize=11, fontName='Helvetica-Bold', spaceAfter=6, spaceBefore=6, textColor=colors.black)
-        self.terms_content_style = ParagraphStyle('TermsContent', parent=self.styles['Normal'], fontSize=9, spaceAfter=6, textColor=self.dark_gray, leading=12)
-        self.footer_style = ParagraphStyle('Footer', parent=self.styles['Normal'], fontSize=8, alignment=TA_CENTER, textColor=self.medium_gray)
+        """Bind the process-wide paragraph styles shared by every generator"""
+        styles = pdf_assets.get_styles()
+        self.styles = styles.sample
+        self.title_style = styles.title
+        self.section_heading_style = styles.section_heading
+        self.normal_style = styles.normal
+        self.right_style = styles.right
+        self.terms_heading_style = styles.terms_heading
+        self.terms_content_style = styles.terms_content
+        self.footer_style = styles.footer
+        self.total_value_style = styles.total_value
+        self.grand_total_style = styles.grand_total
+        self.total_label_style = styles.total_label
+        self.grand_label_style = styles.grand_label
+
+    def _quotation_date(self):
+        # The document date is the quotation's own date, so re-rendering an
+        # unchanged quotation produces the same PDF.
+        created_at = getattr(self.quotation, 'created_at', None)
+        return timezone.localtime(created_at) if created_at else datetime.now()
 
     def _build_header_and_customer_info(self):
         """Builds header and customer info based on requested changes."""
         elements = [
             Paragraph("QUOTATION", self.title_style),
-            Paragraph(f"Date: {datetime.now().strftime('%d-%m-%Y')}", self.right_style),
+            Paragraph(f"Date: {self._quotation_date().strftime('%d-%m-%Y')}", self.right_style),
             Paragraph(f"Ref No.: {self.quotation.quotation_number}", self.right_style),
             Spacer(1, 8 * mm),
             Paragraph("To:", self.normal_style),
@@ -314,13 +324,9 @@ class QuotationPDFGenerator:
         else:
             tax_amount = subtotal_before_tax * (tax_rate / 100)
             grand_total = subtotal_before_tax + tax_amount
-        val_style = ParagraphStyle('TotalVal', parent=self.styles['Normal'], fontSize=10, alignment=TA_RIGHT, textColor=self.dark_gray)
-        grand_total_style = ParagraphStyle('GrandTotal', parent=self.styles['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=self.primary_blue)
-        label_style = ParagraphStyle('TotalLabel', parent=self.styles['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=self.dark_gray)
-        grand_label_style = ParagraphStyle('GrandLabel', parent=self.styles['Normal'], fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold', textColor=self.primary_blue)
         def create_row(label, value, is_grand_total=False):
-            l_style = grand_label_style if is_grand_total else label_style
-            v_style = grand_total_style if is_grand_total else val_style
+            l_style = self.grand_label_style if is_grand_total else self.total_label_style
+            v_style = self.grand_total_style if is_grand_total else self.total_value_style
             return [Paragraph(label, l_style), Paragraph(value, v_style)]
 
         totals_data = [
@@ -462,12 +468,10 @@ class QuotationPDFGenerator:
             try:
                 if os.path.exists(str(signature)):
                     signature_flowable = RLImage(signature, width=SIGN_W, height=SIGN_H, kind="proportional")
-                elif str(signature).startswith(("http://", "https://")):
-                    resp = requests.get(signature, timeout=1)
-                    resp.raise_for_status()
-                    img_io = io.BytesIO(resp.content)
-                    signature_flowable = RLImage(img_io, width=SIGN_W, height=SIGN_H, kind="proportional")
-            except Exception:
+                elif self._remote_images.get(str(signature)):
+                    signature_flowable = RLImage(self._remote_images[str(signature)], width=SIGN_W, height=SIGN_H, kind="proportional")
+            except Exception as e:
+                logger.warning(f"Skipping signature {signature} in quotation PDF: {e}")
                 signature_flowable = None
         creator_name = "Admin"
         creator_phone = ""
@@ -505,8 +509,16 @@ class QuotationPDFGenerator:
         elements.append(footer_table)
         return elements
 
+    def _prefetch_remote_images(self):
+        """Download every remote item image and the signature concurrently, before layout"""
+        sources = [item.get('image_path') or item.get('image_url') for item in self.items_data]
+        sources.append(self.signature)
+        remote = [str(s) for s in sources if s and str(s).startswith(('http://', 'https://'))]
+        self._remote_images = prefetch_images(remote)
+
     def generate(self):
         """Generate the complete PDF"""
+        self._prefetch_remote_images()
         elements = [NextPageTemplate('firstPage')]
         
         elements.extend(self._build_header_and_customer_info())
@@ -1,7 +1,10 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
 from .models import Product
+from .autocomplete import product_index
+from .dashboard import invalidate_admin_dashboard_stats
 from rest_framework import serializers
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -41,6 +44,8 @@ class BulkProductUploadView(APIView):
         if success_objects:
             created_products = Product.objects.bulk_create(success_objects)
             created_count = len(created_products)
+            transaction.on_commit(product_index.invalidate)
+            invalidate_admin_dashboard_stats()
 
         return Response({
             "message": f"Successfully created {created_count} products.",
@@ -11,6 +11,7 @@ from django.shortcuts import get_object_or_404
 from .views import BaseAPIView, JWTAuthMixin
 from .models import  Product, Category
 from .forms import ProductForm
+from .thumbnails import build_product_derivatives
 from django.db.models import ProtectedError
 
 logger = logging.getLogger(__name__)
@@ -70,6 +71,7 @@ class ProductCreateView(BaseAPIView):
 
             file_content = ContentFile(image_file.read())
             product.image.save(relative_path, file_content, save=True)
+            build_product_derivatives(product)
 
             return True
         except Exception:
@@ -1,6 +1,7 @@
 from .models import ProductImage
 from .forms import ProductImageForm
 from .views import JWTAuthMixin 
+from .thumbnails import build_product_image_derivatives
 from django.views.generic import View
 from django.http import JsonResponse
 
@@ -11,6 +12,7 @@ class ProductImageUploadView(JWTAuthMixin, View):
 
         if form.is_valid():
             product_image = form.save()
+            build_product_image_derivatives(product_image)
             
             image_url = request.build_absolute_uri(product_image.image.url)
 
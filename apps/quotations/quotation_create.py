@@ -3,6 +3,7 @@
 from django.http import JsonResponse
 from django.db import transaction
 from django.conf import settings
+from django.utils import timezone
 import logging, traceback
 from decimal import Decimal
 from django.db.models import Count
@@ -13,6 +14,7 @@ from .models import Product, TermsAndConditions, ActivityLog, Quotation, Custome
 from .forms import QuotationForm, CustomerForm
 from .choices import ActivityAction, LeadStatus, QuotationStatus,LeadSource
 from .save_quotation import save_quotation_pdf
+from .pdf_queue import enqueue_quotation_pdf
 from .email_service import send_quotation_email
 from apps.accounts.models import User, Roles
 
@@ -76,8 +78,14 @@ class QuotationCreate(JWTAuthMixin, BaseAPIView):
         quotation.subtotal = totals['subtotal']
         quotation.total = totals['total']
 
-        # 3. Generate PDF
-        if items_data:
+        # 3. Generate PDF (queued for the background renderer when enabled)
+        pdf_job = None
+        if items_data and getattr(settings, 'PDF_RENDER_ASYNC', False):
+            pdf_job = enqueue_quotation_pdf(
+                quotation, request, items_data, terms=valid_term_ids, send_email=send_immediately
+            )
+            quotation.has_pdf = False
+        elif items_data:
             try:
                 _, pdf_url = save_quotation_pdf(quotation, request, items_data=items_data, terms=valid_term_ids)
                 quotation.file_url = pdf_url
@@ -90,7 +98,8 @@ class QuotationCreate(JWTAuthMixin, BaseAPIView):
         log_quotation_changes(quotation, action, user)
 
         quotation.save(update_fields=['subtotal', 'total', 'file_url', 'has_pdf', 'status'])
-        if send_immediately:
+        # A queued job sends the email itself once its PDF is ready.
+        if send_immediately and pdf_job is None:
             quotation.refresh_from_db() 
             try:
                 send_quotation_email(quotation)
@@ -155,7 +164,7 @@ class QuotationCreate(JWTAuthMixin, BaseAPIView):
                         lead = Lead.objects.get(id=lead_id)
                         # Mark all old quotations of this lead as REVISED
                         old_quotations = Quotation.objects.filter(lead_id=lead.id).exclude(id=quotation.id)
-                        old_quotations.update(status=QuotationStatus.REVISED)
+                        old_quotations.update(status=QuotationStatus.REVISED, updated_at=timezone.now())
                         # Assign new quotation to the same person as the lead
                         quotation.assigned_to = lead.assigned_to
                         QuotationLeadLink.objects.get_or_create(quotation=quotation, lead=lead)
@@ -175,7 +184,7 @@ class QuotationCreate(JWTAuthMixin, BaseAPIView):
                     )
                     QuotationLeadLink.objects.create(quotation=quotation, lead=lead)
                     quotation.lead_id = lead.id
-                quotation.save(update_fields=["lead_id", "status", "assigned_to"]) 
+                quotation.save(update_fields=["lead", "status", "assigned_to"]) 
 
             # Step 6: Process items, totals, PDF, and email
             self._process_quotation_data(quotation, request, user, action=ActivityAction.QUOTATION_CREATED)
@@ -252,7 +261,7 @@ class QuotationCreate(JWTAuthMixin, BaseAPIView):
                 QuotationLeadLink.objects.get_or_create(quotation=quotation, lead=lead)
                 lead.quotation_id = quotation.id
                 lead.status = LeadStatus.NEGOTIATION
-                lead.save(update_fields=['status', 'quotation_id'])
+                lead.save(update_fields=['status', 'quotation'])
 
             # Step 4: Process items, totals, PDF, and email
             self._process_quotation_data(quotation, request, user, action=ActivityAction.QUOTATION_UPDATED)
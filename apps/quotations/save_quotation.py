@@ -1,9 +1,10 @@
 import os
+from urllib.parse import urljoin
 from django.conf import settings
 import logging
-from datetime import datetime
 from .models import CompanyProfile, Product
 from .pdf_service import QuotationPDFGenerator
+from . import pdf_cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,41 @@ def _extract_product_id(item):
     except (TypeError, ValueError):
         return None
 
+def _pdf_image_path(obj):
+    # Prefer the print-size derivative; fall back to the original upload.
+    derivative = getattr(obj, 'image_pdf', None)
+    if derivative and os.path.exists(derivative.path):
+        return derivative.path
+    return obj.image.path if obj.image else None
+
+
+def quotation_items_data(quotation):
+    """Rebuilds the `items` payload QuotationCreate receives from the stored details."""
+    return [
+        {
+            'product': detail.product_id,
+            'quantity': detail.quantity,
+            'unit_price': str(detail.unit_price),
+            'discount': str(detail.discount or 0),
+        }
+        for detail in quotation.details.all()
+    ]
+
 def save_quotation_pdf(quotation, request, items_data, terms=None):
+    return render_quotation_pdf(
+        quotation,
+        request.user,
+        items_data,
+        terms=terms,
+        base_url=request.build_absolute_uri('/'),
+    )
+
+def render_quotation_pdf(quotation, user, items_data, terms=None, base_url='', force=False):
+    """
+    Builds and stores the quotation PDF without needing a request, so it can
+    run inside the background renderer. Returns (file_path, pdf_url).
+    `force` rebuilds the file even when a stored copy matches.
+    """
     try:
         product_ids = [product_id for item in items_data if (product_id := _extract_product_id(item)) is not None]
         products = {p.id: p for p in Product.objects.filter(id__in=product_ids)}
@@ -44,35 +79,35 @@ def save_quotation_pdf(quotation, request, items_data, terms=None):
                 'description': item.get('description', product.name),
                 'discount': item.get('discount', 0),
                 # FIX: Use the local file system path instead of a URL
-                'image_path': product.image.path if product.image else None
+                'image_path': _pdf_image_path(product)
             })
 
-        company_profile = CompanyProfile.objects.first()
-
         # FIX: Use local path for signature
         signature_path = None
-        if hasattr(request.user, 'signature') and request.user.signature and request.user.signature.image:
-            signature_path = request.user.signature.image.path
+        if user is not None and hasattr(user, 'signature') and user.signature and user.signature.image:
+            signature_path = _pdf_image_path(user.signature)
         
-        generator = QuotationPDFGenerator(
-            user=request.user,
-            quotation=quotation,
-            items_data=enriched_items,
-            company_profile=company_profile,
-            terms=terms,
-            signature=signature_path
+        # Identical render inputs map to the same file, so unchanged
+        # quotations are served from disk instead of being rebuilt.
+        fingerprint = pdf_cache.quotation_pdf_fingerprint(
+            quotation, user, enriched_items, terms=terms, signature=signature_path
         )
-        pdf_content = generator.generate()
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_name = f'quotation_{quotation.quotation_number}_{timestamp}.pdf'
+        file_name = pdf_cache.pdf_file_name(quotation, fingerprint)
         file_path = os.path.join(settings.MEDIA_ROOT, 'quotations', file_name)
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        with open(file_path, 'wb') as f:
-            f.write(pdf_content)
+        if force or not pdf_cache.lookup(file_path):
+            generator = QuotationPDFGenerator(
+                user=user,
+                quotation=quotation,
+                items_data=enriched_items,
+                company_profile=CompanyProfile.objects.first(),
+                terms=terms,
+                signature=signature_path
+            )
+            pdf_content = generator.generate()
+            pdf_cache.write_atomic(file_path, pdf_content)
 
-        pdf_url = request.build_absolute_uri(os.path.join(settings.MEDIA_URL, 'quotations', file_name))
+        pdf_url = urljoin(base_url, os.path.join(settings.MEDIA_URL, 'quotations', file_name))
         return file_path, pdf_url
 
     except Exception as e:
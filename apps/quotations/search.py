@@ -0,0 +1,134 @@
+# File: search.py
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, CharField, Exists, FloatField, Func, OuterRef, Q, Value, When
+from django.db.models.functions import Replace
+
+from apps.accounts.models import Roles
+from .models import Customer, Lead, Product, Quotation
+from .serialization import RowShape, as_float
+
+PRODUCT_RESULT = RowShape(
+    ('id', 'id'),
+    ('name', 'name'),
+    ('category', 'category__name'),
+    ('cost_price', 'cost_price', as_float),
+    ('selling_price', 'selling_price', as_float),
+    ('unit', 'unit'),
+    ('description', 'description'),
+    ('is_available', 'is_available'),
+    ('active', 'active'),
+    ('brand', 'brand'),
+)
+
+
+CUSTOMER_RESULT = RowShape(
+    ('id', 'id'),
+    ('name', 'name'),
+    ('email', 'email'),
+    ('company_name', 'company_name'),
+    ('phone', 'phone'),
+    ('address', 'primary_address'),
+)
+
+
+PHONE_SEPARATORS = ' +-()'
+
+
+def _uses_trigrams():
+    return connection.vendor == 'postgresql'
+
+
+class PhoneDigits(Func):
+    """
+    A phone column with everything but its digits removed. On PostgreSQL
+    this is the REGEXP_REPLACE expression the customer phone trigram index
+    is built on; elsewhere PHONE_SEPARATORS are stripped with REPLACE.
+    """
+    template = "REGEXP_REPLACE(%(expressions)s, '[^0-9]', '', 'g')"
+    output_field = CharField()
+    arity = 1
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if connection.vendor == 'postgresql':
+            return super().as_sql(compiler, connection, **extra_context)
+        expression = self.get_source_expressions()[0]
+        for separator in PHONE_SEPARATORS:
+            expression = Replace(expression, Value(separator))
+        return compiler.compile(expression)
+
+
+def _match(term, weighted_fields, fuzzy=True):
+    """
+    Filter and relevance score for `term` over `(lookup, weight)` pairs,
+    best field first. A prefix match on the first field scores highest.
+    Substring matches use icontains, which PostgreSQL runs as
+    `UPPER(col::text) LIKE UPPER(...)`; the pg_trgm GIN indexes are built on
+    that same expression so they can serve it. On PostgreSQL, a close word
+    match on the first field (`%>`) also counts when `fuzzy` is set, so
+    small typos still find the row.
+    """
+    first = weighted_fields[0][0]
+    condition = Q()
+    whens = [When(**{f'{first}__istartswith': term}, then=Value(weighted_fields[0][1] + 1.0))]
+    for lookup, weight in weighted_fields:
+        condition |= Q(**{f'{lookup}__icontains': term})
+        whens.append(When(**{f'{lookup}__icontains': term}, then=Value(weight)))
+    if fuzzy and _uses_trigrams():
+        condition |= Q(**{f'{first}__trigram_word_similar': term})
+    return condition, Case(*whens, default=Value(0.0), output_field=FloatField())
+
+
+def search_products(term, limit, offset=0):
+    """
+    Products matching `term` in name, brand, category or description,
+    best match first. Returns one more row than `limit` so the caller can
+    tell whether there is another page.
+    """
+    condition, score = _match(term, [
+        ('name', 3.0), ('brand', 2.0), ('category__name', 1.5), ('description', 1.0),
+    ])
+    products = Product.objects.filter(condition).annotate(score=score)
+    ordering = ['-score']
+    if _uses_trigrams():
+        products = products.annotate(similarity=TrigramWordSimilarity(term, 'name'))
+        ordering.append('-similarity')
+    products = products.order_by(*ordering, 'name', 'id')
+    return PRODUCT_RESULT.rows(products[offset:offset + limit + 1])
+
+
+def customers_visible_to(user):
+    """
+    Customers a salesperson created or has a lead or quotation for (assigned
+    or created); everyone else sees all of them.
+    """
+    customers = Customer.objects.all()
+    if getattr(user, 'role', None) != Roles.SALESPERSON:
+        return customers
+    own = Q(assigned_to=user) | Q(created_by=user)
+    return customers.filter(
+        Q(created_by=user)
+        | Exists(Lead.objects.filter(own, customer=OuterRef('pk')))
+        | Exists(Quotation.objects.filter(own, customer=OuterRef('pk')))
+    )
+
+
+def search_customers(user, term, limit, offset=0):
+    """
+    Customers visible to `user` matching `term` in name, company, phone or
+    email, best match first. A term made of digits (spaces, +, - and
+    brackets are ignored) is treated as a phone fragment and matched
+    against the digits of the stored phone numbers, however those are
+    formatted. Returns one more row than `limit`, like search_products.
+    """
+    customers = customers_visible_to(user)
+    digits = ''.join(ch for ch in term if ch not in PHONE_SEPARATORS)
+    if digits.isdigit():
+        customers = customers.annotate(phone_digits=PhoneDigits('phone'))
+        condition, score = _match(digits, [('phone_digits', 3.0), ('name', 1.0), ('company_name', 1.0)], fuzzy=False)
+    else:
+        condition, score = _match(term, [('name', 3.0), ('company_name', 2.5), ('phone', 2.0), ('email', 1.5)])
+    customers = customers.filter(condition).annotate(score=score)
+    customers = customers.order_by('-score', 'name', 'id')
+    return CUSTOMER_RESULT.rows(customers[offset:offset + limit + 1])
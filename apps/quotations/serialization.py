@@ -0,0 +1,202 @@
+# File: serialization.py
+
+import datetime
+import json
+from collections import defaultdict
+from decimal import Decimal
+from operator import itemgetter
+
+from django.http import HttpResponse
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Promise):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+    Compact JSON as bytes. Decimals are written as numbers and datetimes as
+    ISO 8601 (UTC as `Z`); orjson is used when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse drop-in that encodes with `dumps`."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def as_float(value):
+    return float(value) if value else 0.0
+
+
+def full_name(first_name, last_name):
+    """Same as AbstractUser.get_full_name(), from two columns."""
+    return f"{first_name or ''} {last_name or ''}".strip()
+
+
+class RowShape:
+    """
+    A response dict described once and built from `.values_list()` tuples.
+
+    Each field is `(key, source)` or `(key, source, convert)`. `source` is a
+    lookup, a tuple of lookups (passed to `convert` as arguments) or a nested
+    RowShape whose lookups are prefixed with `source.prefix`. `columns` is
+    what to pass to values_list(); `compile(columns)` returns a function that
+    turns one row into the dict, with every index worked out up front.
+    """
+
+    def __init__(self, *fields, prefix=''):
+        self.fields = [field if len(field) == 3 else (*field, None) for field in fields]
+        self.prefix = prefix
+
+    def nested(self, prefix):
+        return RowShape(*self.fields, prefix=prefix)
+
+    def only(self, keys):
+        return RowShape(*(field for field in self.fields if field[0] in keys), prefix=self.prefix)
+
+    def _lookups(self, parent=''):
+        prefix = parent + self.prefix
+        for _, source, _ in self.fields:
+            if isinstance(source, RowShape):
+                yield from source._lookups(prefix)
+            elif isinstance(source, tuple):
+                yield from (prefix + lookup for lookup in source)
+            else:
+                yield prefix + source
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(self._lookups()))
+
+    def compile(self, columns, parent=''):
+        index = {column: position for position, column in enumerate(columns)}
+        prefix = parent + self.prefix
+        getters = []
+        for key, source, convert in self.fields:
+            if isinstance(source, RowShape):
+                getter = source.compile(columns, prefix)
+            elif isinstance(source, tuple):
+                many = itemgetter(*(index[prefix + lookup] for lookup in source))
+                getter = (lambda row, many=many, convert=convert: convert(*many(row)))
+            else:
+                getter = itemgetter(index[prefix + source])
+                if convert is not None:
+                    getter = (lambda row, one=getter, convert=convert: convert(one(row)))
+            getters.append((key, getter))
+
+        def build(row):
+            return {key: getter(row) for key, getter in getters}
+        return build
+
+    def rows(self, queryset):
+        """Evaluates `queryset` for this shape and returns the built dicts."""
+        columns = self.columns
+        build = self.compile(columns)
+        return [build(row) for row in queryset.values_list(*columns)]
+
+
+def group_rows(shape, queryset, group_by):
+    """Built dicts from `queryset` grouped into a dict keyed by the `group_by` column."""
+    columns = [group_by, *shape.columns]
+    build = shape.compile(columns)
+    groups = defaultdict(list)
+    for row in queryset.values_list(*columns):
+        groups[row[0]].append(build(row))
+    return groups
+
+
+USER_REF = RowShape(
+    ('id', 'id'),
+    ('name', ('id', 'first_name', 'last_name'), lambda pk, first, last: full_name(first, last) if pk else None),
+)
+
+CUSTOMER_SUMMARY = RowShape(
+    ('id', 'id'),
+    ('name', 'name'),
+    ('email', 'email'),
+    ('phone', 'phone'),
+    ('company_name', 'company_name'),
+)
+
+CUSTOMER = RowShape(
+    *CUSTOMER_SUMMARY.fields,
+    ('gst_number', 'gst_number'),
+    ('website', 'website'),
+    ('shipping_address', 'shipping_address'),
+    ('billing_address', 'billing_address'),
+    ('primary_address', 'primary_address'),
+    ('title', 'title'),
+    ('created_at', 'created_at'),
+)
+
+TERM_REF = RowShape(
+    ('id', 'terms__id'),
+    ('title', 'terms__title'),
+)
+
+LINE_ITEM = RowShape(
+    ('id', 'id'),
+    ('product_id', 'product_id'),
+    ('name', 'product__name'),
+    ('selling_price', 'selling_price', as_float),
+    ('quantity', 'quantity'),
+    ('percentage_discount', 'discount', as_float),
+    ('description', 'product__description'),
+)
+
+QUOTATION_SUMMARY = RowShape(
+    ('id', 'id'),
+    ('quotation_number', 'quotation_number'),
+    ('status', 'status'),
+    ('url', 'file_url'),
+    ('subtotal', 'subtotal', as_float),
+    ('total', 'total', as_float),
+    ('created_at', 'created_at'),
+    ('assigned_to', USER_REF.nested('assigned_to__')),
+)
+
+QUOTATION = RowShape(
+    ('id', 'id'),
+    ('quotation_number', 'quotation_number'),
+    ('status', 'status'),
+    ('url', 'file_url'),
+    ('discount', 'discount', as_float),
+    ('discount_type', 'discount_type'),
+    ('subtotal', 'subtotal', as_float),
+    ('tax_rate', 'tax_rate', as_float),
+    ('total', 'total', as_float),
+    ('assigned_to', USER_REF.nested('assigned_to__')),
+    ('created_at', 'created_at'),
+    ('emailed_at', 'emailed_at'),
+    ('follow_up_date', 'follow_up_date'),
+)
+
+LEAD = RowShape(
+    ('id', 'id'),
+    ('status', 'status'),
+    ('lead_source', 'lead_source'),
+    ('file_url', 'quotation__file_url'),
+    ('quotation_id', 'quotation_id'),
+    ('assigned_to', USER_REF.nested('assigned_to__')),
+    ('created_at', 'created_at'),
+)
@@ -1,6 +1,7 @@
 from .models import SignatureImage
 from .forms import SignatureImageForm
 from .views import JWTAuthMixin
+from .thumbnails import build_signature_derivatives
 from django.views.generic import View
 from django.http import JsonResponse
 
@@ -18,6 +19,7 @@ class SignatureManageView(JWTAuthMixin, View):
                 user=request.user,
                 image=image_file
             )
+            build_signature_derivatives(signature_image)
             image_url = request.build_absolute_uri(signature_image.image.url)
             return JsonResponse({
                 'success': True,
@@ -0,0 +1,124 @@
+# File: status_cascade.py
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .activity_buffer import current_buffer
+from .choices import ActivityAction, LeadStatus, QuotationStatus
+from .models import ActivityLog, Lead, Quotation
+
+# A lead reaching one of these statuses moves its quotations to the paired
+# status, and the other way round.
+LEAD_TO_QUOTATION = {
+    LeadStatus.CONVERTED: QuotationStatus.ACCEPTED,
+    LeadStatus.LOST: QuotationStatus.REJECTED,
+    LeadStatus.NEGOTIATION: QuotationStatus.REVISED,
+}
+QUOTATION_TO_LEAD = {quotation: lead for lead, quotation in LEAD_TO_QUOTATION.items()}
+
+LEAD_REASONS = {
+    LeadStatus.CONVERTED: 'conversion',
+    LeadStatus.LOST: 'lost',
+    LeadStatus.NEGOTIATION: 'negotiation',
+}
+
+
+def _update_returning(model, set_status, filters, returning):
+    """
+    Sets `status` (and bumps updated_at) on every row matching `filters`
+    whose status differs and returns the changed rows, each with its
+    previous status as `old_status`.
+    PostgreSQL does it in one UPDATE ... FROM ... RETURNING; SQLite can't
+    return columns of the FROM clause, so it locks, reads and updates.
+    """
+    now = timezone.now()
+    if connection.vendor != 'postgresql':
+        with transaction.atomic():
+            rows = list(
+                model.objects.select_for_update().filter(**filters)
+                .exclude(status=set_status)
+                .values(*returning, old_status=F('status'))
+            )
+            if rows:
+                model.objects.filter(id__in=[row['id'] for row in rows]).update(status=set_status, updated_at=now)
+        return rows
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    where = ' AND '.join(f'{quote(column)} = %s' for column in filters)
+    columns = ', '.join(f'{table}.{quote(column)}' for column in returning)
+    sql = (
+        f'UPDATE {table} SET status = %s, updated_at = %s '
+        f'FROM (SELECT id, status FROM {table} WHERE {where} AND status <> %s FOR UPDATE) AS old '
+        f'WHERE {table}.id = old.id '
+        f'RETURNING {columns}, old.status'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [set_status, now, *filters.values(), set_status])
+        rows = cursor.fetchall()
+    return [dict(zip([*returning, 'old_status'], row)) for row in rows]
+
+
+def _write_logs(entries):
+    buffer = current_buffer()
+    if buffer is not None:
+        for entry in entries:
+            buffer.add(entry)
+    elif entries:
+        ActivityLog.objects.bulk_create(entries)
+
+
+def cascade_lead_status(lead, actor):
+    """
+    Moves every quotation linked to `lead` to the status paired with the
+    lead's status, logging one QUOTATION_STATUS_CHANGED per quotation.
+    Returns the ids of the quotations that changed.
+    """
+    target = LEAD_TO_QUOTATION.get(lead.status)
+    if target is None:
+        return []
+
+    changed = _update_returning(
+        Quotation, target, {'lead_id': lead.id}, ['id', 'customer_id'],
+    )
+    _write_logs([
+        ActivityLog(
+            actor=actor,
+            action=ActivityAction.QUOTATION_STATUS_CHANGED,
+            entity_type='Quotation',
+            entity_id=str(row['id']),
+            quotation_id=row['id'],
+            customer_id=row['customer_id'],
+            message=f"Status changed from {row['old_status']} to {target} due to lead {lead.id} {LEAD_REASONS[lead.status]}",
+        )
+        for row in changed
+    ])
+    return [row['id'] for row in changed]
+
+
+def cascade_quotation_status(quotation, actor):
+    """
+    Moves the quotation's lead to the status paired with the quotation's
+    status and logs a LEAD_STATUS_CHANGED. Returns the lead id if it changed.
+    """
+    target = QUOTATION_TO_LEAD.get(quotation.status)
+    if target is None or not quotation.lead_id:
+        return None
+
+    changed = _update_returning(
+        Lead, target, {'id': quotation.lead_id}, ['id', 'customer_id'],
+    )
+    _write_logs([
+        ActivityLog(
+            actor=actor,
+            action=ActivityAction.LEAD_STATUS_CHANGED,
+            entity_type='Lead',
+            entity_id=str(row['id']),
+            lead_id=row['id'],
+            customer_id=row['customer_id'],
+            message=f"Status changed from {row['old_status']} to {target} due to quotation {quotation.quotation_number}",
+        )
+        for row in changed
+    ])
+    return changed[0]['id'] if changed else None
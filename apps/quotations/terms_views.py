@@ -2,14 +2,18 @@ from rest_framework import generics
 from .models import TermsAndConditions
 from .serializers import TermsAndConditionsSerializer
 from rest_framework.permissions import AllowAny
+from .conditional import ConditionalGetMixin, queryset_validator
 
 
 # List all terms
-class TermsListView(generics.ListAPIView):
+class TermsListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = TermsAndConditions.objects.all()
     serializer_class = TermsAndConditionsSerializer
     permission_classes = [AllowAny]
 
+    def get_validator(self, request):
+        return queryset_validator(TermsAndConditions.objects.all())
+
 class TermsCreateView(generics.CreateAPIView):
     queryset = TermsAndConditions.objects.all()
     serializer_class = TermsAndConditionsSerializer
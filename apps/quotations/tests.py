@@ -1,3 +1,79 @@
+from datetime import date
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User, Roles
+from .models import Customer, Lead, LeadDescription, Quotation
+
+
+class LeadListViewQueryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='x', role=Roles.ADMIN)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.admin)}'}
+        self.created = 0
+
+    def _add_leads(self, count):
+        for _ in range(count):
+            self.created += 1
+            customer = Customer.objects.create(name=f'Customer {self.created}', phone=str(9000 + self.created))
+            quotation = Quotation.objects.create(
+                customer=customer, created_by=self.admin, file_url=f'http://testserver/media/q{self.created}.pdf'
+            )
+            lead = Lead.objects.create(customer=customer, assigned_to=self.admin, created_by=self.admin)
+            lead.quotation_id = quotation.id
+            lead.save(update_fields=['quotation_id'])
+            LeadDescription.objects.create(lead=lead, next_date=date(2026, 1, 1))
+            LeadDescription.objects.create(lead=lead, next_date=date(2026, 2, self.created))
+
+    def _list_leads(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/quotations/api/leads/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data'], len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_leads(self):
+        self._add_leads(2)
+        data, small = self._list_leads()
+        self.assertEqual(len(data), 2)
+
+        self._add_leads(8)
+        data, large = self._list_leads()
+        self.assertEqual(len(data), 10)
+        self.assertEqual(small, large)
+
+    def test_serializes_latest_next_date_and_quotation(self):
+        self._add_leads(1)
+        data, _ = self._list_leads()
+        quotation = Quotation.objects.get()
+        self.assertEqual(data[0]['next_date'], '2026-02-01')
+        self.assertEqual(data[0]['quotation_number'], quotation.quotation_number)
+        self.assertEqual(data[0]['pdf_url'], quotation.file_url)
+
+
+class CustomerListETagTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='x', role=Roles.ADMIN)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.admin)}'}
+        self.customer = Customer.objects.create(name='Old Name', phone='9001')
+
+    def _list_customers(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get('/quotations/api/customers/unfiltered/', **self.auth, **headers)
+
+    def test_put_changes_list_etag(self):
+        etag = self._list_customers()['ETag']
+        self.assertEqual(self._list_customers(etag).status_code, 304)
+
+        response = self.client.put(
+            f'/quotations/api/customers/create/?id={self.customer.id}',
+            '{"name": "New Name", "phone": "9001"}', content_type='application/json', **self.auth,
+        )
+        self.assertEqual(response.status_code, 200)
 
-# Create your tests here.
+        response = self._list_customers(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['data'][0]['name'], 'New Name')
@@ -0,0 +1,86 @@
+# File: thumbnails.py
+
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Item images are drawn in a 16 x 16 mm box and signatures in 40 x 20 mm;
+# both are rendered at 150 dpi. The list size backs the product grid.
+PDF_ITEM_SIZE = (95, 95)
+PDF_SIGNATURE_SIZE = (236, 118)
+LIST_SIZE = (320, 320)
+
+
+def _render(source, max_size):
+    """Returns (bytes, extension) for a downscaled copy of an image file."""
+    source.open('rb')
+    try:
+        with Image.open(source) as img:
+            img.thumbnail(max_size)
+            out = io.BytesIO()
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img.save(out, format='PNG', optimize=True)
+                return out.getvalue(), 'png'
+            img.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+            return out.getvalue(), 'jpg'
+    finally:
+        source.close()
+
+
+def _save_derivative(instance, source_field, target_field, max_size, suffix):
+    source = getattr(instance, source_field)
+    if not source:
+        return False
+    content, ext = _render(source, max_size)
+    base, _ = os.path.splitext(os.path.basename(source.name))
+    getattr(instance, target_field).save(f"{base}_{suffix}.{ext}", ContentFile(content), save=False)
+    return True
+
+
+def _build(instance, specs):
+    """
+    Generates every (source, target, size, suffix) derivative and saves once.
+    Targets that could not be rebuilt are cleared, so readers fall back to
+    the original upload rather than a derivative of the previous image.
+    """
+    updated = []
+    try:
+        for source_field, target_field, max_size, suffix in specs:
+            if _save_derivative(instance, source_field, target_field, max_size, suffix):
+                updated.append(target_field)
+    except Exception:
+        logger.exception(f"Failed to build derivatives for {instance.__class__.__name__} {instance.pk}")
+    stale = [
+        target_field for _, target_field, _, _ in specs
+        if target_field not in updated and getattr(instance, target_field)
+    ]
+    for target_field in stale:
+        setattr(instance, target_field, None)
+    if updated or stale:
+        instance.save(update_fields=[*updated, *stale])
+    return updated
+
+
+def build_product_derivatives(product):
+    return _build(product, [
+        ('image', 'image_pdf', PDF_ITEM_SIZE, 'pdf'),
+        ('image', 'image_list', LIST_SIZE, 'list'),
+    ])
+
+
+def build_product_image_derivatives(product_image):
+    return _build(product_image, [
+        ('image', 'image_pdf', PDF_ITEM_SIZE, 'pdf'),
+        ('image', 'image_list', LIST_SIZE, 'list'),
+    ])
+
+
+def build_signature_derivatives(signature):
+    return _build(signature, [
+        ('image', 'image_pdf', PDF_SIGNATURE_SIZE, 'pdf'),
+    ])
@@ -9,7 +9,7 @@ from .terms_views import (
 )
 from .duplicate import DuplicateQuotationAPIView
 from .quotation_create import QuotationCreate
-from .merge_pdf import MergePDFsAPIView
+from .merge_pdf import MergePDFsAPIView, MergeQuotationPDFsAPIView
 from .product_image_view import ProductImageUploadView
 from .product_create_view import ProductCreateView
 from .views import (
@@ -30,6 +30,9 @@ from .views import (
     QuotationSendView,
     QuotationAssignView,
     QuotationPDFView,
+    PDFCacheStatsView,
+    PDFRenderBatchView,
+    PDFRenderBatchDetailView,
     
     # Customer Management
     CustomerListView,
@@ -48,6 +51,7 @@ from .views import (
     TopPerfomerView,
     # Product & Customer Search
     ProductSearchView,
+    ProductAutocompleteView,
     CustomerSearchView,
     FilteredCustomerListView,
     UnfilteredCustomerListView,
@@ -87,12 +91,16 @@ urlpatterns = [
     path('api/quotations/<int:quotation_id>/assign/', QuotationAssignView.as_view(), name='quotation_assign'),
     path('api/quotations/<int:quotation_id>/pdf/', QuotationPDFView.as_view(), name='quotation_pdf'),
     path('api/quotations/<int:pk>/duplicate/', DuplicateQuotationAPIView.as_view(), name='quotation_duplicate'),
+    path('api/quotations/pdf-cache/stats/', PDFCacheStatsView.as_view(), name='pdf_cache_stats'),
+    path('api/quotations/pdf-batches/', PDFRenderBatchView.as_view(), name='pdf_batch_create'),
+    path('api/quotations/pdf-batches/<int:batch_id>/', PDFRenderBatchDetailView.as_view(), name='pdf_batch_detail'),
     
     # ========== Product Management API ==========
     path('api/products/', ProductListView.as_view(), name='product_list'),
     path('api/products/create/', ProductCreateView.as_view(), name='product_create'),
     path('api/products/<int:product_id>/', ProductDetailView.as_view(), name='product_detail'),
     path('api/products/search/', ProductSearchView.as_view(), name='product_search'),
+    path('api/products/autocomplete/', ProductAutocompleteView.as_view(), name='product_autocomplete'),
 
     # ========== NEW URLS FOR CATEGORY VIEWSET ==========
     # This single path handles both GET (to list) and POST (to create)
@@ -122,6 +130,7 @@ urlpatterns = [
     path('api/terms/<int:id>/update/', TermUpdateView.as_view(), name='terms-update'),
     path('api/terms/<int:id>/delete/', TermDeleteView.as_view(), name='terms-delete'),
     path('api/merge/', MergePDFsAPIView.as_view(), name='merge_pdfs'),
+    path('api/merge/quotations/', MergeQuotationPDFsAPIView.as_view(), name='merge_quotation_pdfs'),
     path('api/<int:user_id>/stats/',UserStatsView.as_view(),name="user-stats"),
     path('api/product/image/', ProductImageUploadView.as_view(), name='product_image_upload'),
 
@@ -7,6 +7,7 @@ from httpcore import request
 from .models import Product, ProductDetails, TermsAndConditions, ActivityLog,Customer
 from .choices import ActivityAction
 from .forms import CustomerForm
+from .serialization import as_float
 
 logger = logging.getLogger(__name__)
 
@@ -172,7 +173,7 @@ def get_quotation_response_data(quotation,request,lead,term_ids=None):
                 'line_total': float(net_total.quantize(Decimal('0.01'))),
             })
 
-        activity_logs = ActivityLog.objects.filter(entity_type='Quotation', entity_id=str(quotation.id)).select_related('actor').order_by('-created_at')[:10]
+        activity_logs = quotation.activity_logs.select_related('actor').order_by('-created_at')[:10]
         logs_data = [
             {
                 'id': log.id, 
@@ -187,13 +188,13 @@ def get_quotation_response_data(quotation,request,lead,term_ids=None):
             'id': quotation.id,
             'quotation_number': quotation.quotation_number,
             'status': quotation.status,
-            'subtotal': float(quotation.subtotal),
-            'tax_rate': float(quotation.tax_rate or 0),
-            'total': float(quotation.total),
-            'discount': float(quotation.discount or 0.0),
+            'subtotal': as_float(quotation.subtotal),
+            'tax_rate': as_float(quotation.tax_rate),
+            'total': as_float(quotation.total),
+            'discount': as_float(quotation.discount),
             'discount_type': quotation.discount_type,
             'additional_charge_name': quotation.additional_charge_name,
-            'additional_charge_amount': float(quotation.additional_charge_amount or 0.0),
+            'additional_charge_amount': as_float(quotation.additional_charge_amount),
             'currency': quotation.currency,
             'is_tax_inclusive': bool(getattr(quotation, 'is_tax_inclusive', False)),
             'customer': {
@@ -2,7 +2,7 @@ from django.db.models import Q
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import View
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.db import transaction
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
@@ -15,7 +15,8 @@ import json
 from apps.accounts.models import User, Roles
 from .models import (
     Quotation, Lead, Customer, Product,ProductImage,
-    TermsAndConditions, CompanyProfile, ActivityLog,Category, LeadDescription
+    TermsAndConditions, CompanyProfile, ActivityLog,Category, LeadDescription, PDFRenderBatch, ProductDetails,
+    CustomerCompany, normalize_company_name,
 )
 from .models import QuotationLeadLink
 from .forms import (
@@ -29,17 +30,46 @@ from rest_framework import viewsets
 from django.http import JsonResponse
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from .save_quotation import save_quotation_pdf
-from django.db.models import Prefetch
+from .save_quotation import render_quotation_pdf, quotation_items_data
+from .pdf_cache import get_cache_stats
+from .pdf_images import get_fetch_stats
+from .merge_pdf import get_merge_cache_stats
+from .pagination import (
+    keyset_page, page_size, page_offset, requested_fields, stream_json_page, InvalidPageRequest,
+)
+from .pdf_queue import create_pdf_batch, resume_pdf_batch, batch_progress
+from .conditional import ConditionalGetMixin, queryset_validator
+from .search import search_products, search_customers, customers_visible_to
+from .autocomplete import product_index
+from .dashboard import admin_dashboard_stats
+from .serialization import (
+    FastJsonResponse, RowShape, group_rows,
+    USER_REF, CUSTOMER, CUSTOMER_SUMMARY, TERM_REF, LINE_ITEM, QUOTATION, QUOTATION_SUMMARY, LEAD,
+)
+from django.db.models import Prefetch, OuterRef, Subquery, Exists, prefetch_related_objects
 import logging
 from django.http import JsonResponse
 from django.db import transaction
 from django.conf import settings
 logger = logging.getLogger(__name__)
 from datetime import datetime
-from django.db.models import Count, Q, Case, When, F, FloatField
+from django.db.models import Count, Q, Case, When, F, FloatField, Max
 from django.db.models.deletion import ProtectedError
 
+def serialize_list_log(log):
+    """Compact activity log entry embedded in list responses."""
+    return {
+        'id': log.id,
+        'action': log.action,
+        'message': log.message,
+        'actor': {
+            'id': log.actor.id if log.actor else None,
+            'name': log.actor.get_full_name() if log.actor else 'System'
+        },
+        'created_at': log.created_at
+    }
+
+
 class JWTAuthMixin:
     """Base mixin to authenticate requests using JWT access token."""
 
@@ -198,7 +228,7 @@ class LeadListView(JWTAuthMixin, BaseAPIView):
         is_converted_request = (filter_path == "converted" or lead_filter == "converted")
         is_lost_request = (filter_path == "lost" or lead_filter == "lost")
         
-        leads = Lead.objects.select_related("customer", "assigned_to", "created_by")
+        leads = Lead.objects.select_related("customer", "assigned_to", "created_by", "quotation")
         if is_converted_request:
             leads = leads.filter(status=LeadStatus.CONVERTED)
         elif is_lost_request:
@@ -209,27 +239,28 @@ class LeadListView(JWTAuthMixin, BaseAPIView):
         if getattr(user, "role", None) == Roles.SALESPERSON:
             leads = leads.filter(Q(assigned_to=user) | Q(created_by=user))
 
-        leads = leads.order_by("-created_at")
+        latest_next_date = LeadDescription.objects.filter(
+            lead=OuterRef('pk')
+        ).order_by('-pk').values('next_date')[:1]
+        leads = leads.annotate(latest_next_date=Subquery(latest_next_date)).order_by("-created_at")
         data = [self.serialize_lead(lead) for lead in leads]
         return JsonResponse({"data": data}, status=200, safe=False)
 
     @staticmethod
     def serialize_lead(lead):
+        """Expects the latest_next_date annotation and a joined quotation."""
         customer = lead.customer
         assigned_to = lead.assigned_to
-        next_date = LeadDescription.objects.filter(lead=lead).values_list('next_date', flat=True).last()
+        next_date = lead.latest_next_date
         
         # Get PDF URL and quotation number from associated quotation if it exists
         pdf_url = None
         quotation_number = None
-        if lead.quotation_id:
-            try:
-                quotation = Quotation.objects.get(pk=lead.quotation_id)
-                if quotation.file_url:
-                    pdf_url = quotation.file_url
-                quotation_number = quotation.quotation_number
-            except Quotation.DoesNotExist:
-                pass
+        quotation = lead.quotation
+        if quotation:
+            if quotation.file_url:
+                pdf_url = quotation.file_url
+            quotation_number = quotation.quotation_number
         
         return {
             "id": lead.id,
@@ -290,7 +321,7 @@ class LeadCreateView(JWTAuthMixin, BaseAPIView):
             # 7. Save lead and update quotation with lead_id
             lead.save()
             quotation.lead_id = lead.id
-            quotation.save(update_fields=['lead_id'])
+            quotation.save(update_fields=['lead'])
 
             # 8. Log the activity
             ActivityLog.log(
@@ -351,10 +382,7 @@ class LeadDetailView(BaseAPIView):
         #     logger.exception("Failed to log lead view action")
 
         # # Activity logs for this lead (latest first)
-        activity_logs = ActivityLog.objects.filter(
-            entity_type="Lead",
-            entity_id=str(lead.id)
-        ).select_related('actor').order_by('-created_at')
+        activity_logs = lead.activity_logs.select_related('actor').order_by('-created_at')
 
         logs = []
         for log in activity_logs:
@@ -441,7 +469,7 @@ class LeadDetailView(BaseAPIView):
             'updated_at': lead.updated_at,
         }
 
-        return JsonResponse({'data': data})
+        return FastJsonResponse({'data': data})
 
     def put(self, request, lead_id):
         lead = get_object_or_404(Lead, pk=lead_id)
@@ -501,106 +529,157 @@ class LeadAssignView(AdminRequiredMixin, BaseAPIView):
         })
 #region Quotations
 
-class QuotationListView(JWTAuthMixin, BaseAPIView):
+class QuotationListView(JWTAuthMixin, ConditionalGetMixin, BaseAPIView):
+    """
+    Newest-first quotations, one keyset page at a time (`limit`, `cursor`).
+    Filters: status, customer, assigned_to, created_from, created_to
+    (YYYY-MM-DD) and q (number or customer name). `fields=a,b` limits the
+    columns returned; relations that aren't asked for are not loaded.
+    """
+    FIELDS = (
+        'id', 'quotation_number', 'status', 'url', 'discount', 'discount_type',
+        'subtotal', 'tax_rate', 'total', 'terms', 'customer', 'products',
+        'assigned_to', 'created_by', 'created_at', 'emailed_at', 'follow_up_date',
+        'activity_logs',
+    )
+
+    @staticmethod
+    def _parse_date(request, name):
+        value = request.GET.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise InvalidPageRequest(f"{name} must be a date in YYYY-MM-DD format.")
+
+    def _apply_filters(self, request, quotations):
+        status = request.GET.get('status')
+        if status:
+            if status not in QuotationStatus.values:
+                raise InvalidPageRequest(f"Invalid status '{status}'.")
+            quotations = quotations.filter(status=status)
+
+        for param, field in (('customer', 'customer_id'), ('assigned_to', 'assigned_to_id')):
+            value = request.GET.get(param)
+            if value:
+                if not value.isdigit():
+                    raise InvalidPageRequest(f"{param} must be an id.")
+                quotations = quotations.filter(**{field: int(value)})
+
+        created_from = self._parse_date(request, 'created_from')
+        if created_from:
+            quotations = quotations.filter(created_at__date__gte=created_from)
+        created_to = self._parse_date(request, 'created_to')
+        if created_to:
+            quotations = quotations.filter(created_at__date__lte=created_to)
+
+        search = request.GET.get('q', '').strip()
+        if search:
+            quotations = quotations.filter(
+                Q(quotation_number__icontains=search)
+                | Q(customer__name__icontains=search)
+                | Q(customer__company_name__icontains=search)
+            )
+        return quotations
+
+    SHAPE = RowShape(
+        *QUOTATION.fields,
+        ('customer', RowShape(*CUSTOMER_SUMMARY.fields, ('address', 'primary_address')).nested('customer__')),
+        ('created_by', USER_REF.nested('created_by__')),
+    )
+
+    def _related(self, wanted, ids):
+        """terms, products and activity_logs for the page, keyed by quotation id."""
+        related = {}
+        if 'terms' in wanted:
+            related['terms'] = group_rows(
+                TERM_REF, Quotation.objects.filter(id__in=ids, terms__isnull=False).order_by('terms__id'), 'id'
+            )
+        if 'products' in wanted:
+            related['products'] = group_rows(
+                LINE_ITEM, ProductDetails.objects.filter(quotation_id__in=ids).order_by('id'), 'quotation_id'
+            )
+        if 'activity_logs' in wanted:
+            related['activity_logs'] = {
+                quotation_id: [serialize_list_log(log) for log in logs]
+                for quotation_id, logs in ActivityLog.latest_for('Quotation', ids).items()
+            }
+        return related
+
+    def _quotations(self, request):
+        user = request.user
+        quotations = Quotation.objects.exclude(Q(file_url__isnull=True) | Q(file_url=''))
+        if getattr(user, "role", None) == Roles.SALESPERSON:
+            quotations = quotations.filter(Q(assigned_to=user) | Q(created_by=user))
+        return self._apply_filters(request, quotations)
+
+    def get_validator(self, request):
+        try:
+            quotations = self._quotations(request)
+        except InvalidPageRequest:
+            return None
+        # Customers, product names, term titles, user names and activity logs
+        # all appear in the payload and change without touching the quotation.
+        return (
+            request.user.pk if getattr(request.user, "role", None) == Roles.SALESPERSON else None,
+            queryset_validator(quotations),
+            Customer.objects.aggregate(Max('updated_at'))['updated_at__max'],
+            queryset_validator(Product.objects.all()),
+            queryset_validator(TermsAndConditions.objects.all()),
+            queryset_validator(User.objects.all()),
+            ActivityLog.objects.aggregate(Max('id'))['id__max'],
+        )
+
     def get(self, request):
         user = request.user
         try:
-            quotations = Quotation.objects.select_related(
-                'customer', 'assigned_to', 'created_by'
-            ).prefetch_related(
-                'terms', 'details__product'
-            )
+            fields = requested_fields(request, self.FIELDS)
+            wanted = [f for f in self.FIELDS if fields is None or f in fields]
+            shape = self.SHAPE.only(wanted)
+            columns = list(dict.fromkeys(['id', 'created_at', *shape.columns]))
 
-            quotations = quotations.exclude(Q(file_url__isnull=True) | Q(file_url=''))            
-            if getattr(user, "role", None) == Roles.SALESPERSON:
-                quotations = quotations.filter(Q(assigned_to=user) | Q(created_by=user))
-            else:
+            if getattr(user, "role", None) != Roles.SALESPERSON:
                 logger.info(f"User '{user.username}' is not a salesperson (or is admin). Showing all quotations.")
-            quotations = quotations.order_by('-created_at')
+            quotations = self._quotations(request)
 
-            quotation_ids = quotations.values_list("id", flat=True)
-            
-            activity_logs = ActivityLog.objects.filter(
-                entity_type="Quotation",
-                entity_id__in=[str(qid) for qid in quotation_ids]
-            ).select_related("actor").order_by("-created_at")
-            logs_by_quotation = {}
-            for log in activity_logs:
-                quotation_id = int(log.entity_id)
-                if quotation_id not in logs_by_quotation:
-                    logs_by_quotation[quotation_id] = []
-                logs_by_quotation[quotation_id].append({
-                    "id": log.id,
-                    "action": log.action,
-                    "message": log.message,
-                    "actor": {
-                        "id": log.actor.id if log.actor else None,
-                        "name": log.actor.get_full_name() if log.actor else "System"
-                    },
-                    "created_at": log.created_at
-                })
+            page, next_cursor = keyset_page(
+                quotations.values_list(*columns), request, key=lambda row: (row[1], row[0])
+            )
+            related = self._related(wanted, [row[0] for row in page])
+
+            build = shape.compile(columns)
             data = []
-            for quotation in quotations:
-                data.append({
-                    'id': quotation.id,
-                    'quotation_number': quotation.quotation_number,
-                    'status': quotation.status,
-                    'url': quotation.file_url,
-                    'discount': float(quotation.discount) if quotation.discount else 0.0,
-                    'discount_type': quotation.discount_type,
-                    'subtotal': float(quotation.subtotal),
-                    'tax_rate': float(quotation.tax_rate), 
-                    'total': float(quotation.total),
-                    'terms': [
-                        {
-                            'id': term.id,
-                            'title': term.title,
-                        }
-                        for term in quotation.terms.all()
-                    ],   
-                    'customer': {
-                        'id': quotation.customer.id,
-                        'name': quotation.customer.name,
-                        'email': quotation.customer.email,
-                        'phone': quotation.customer.phone,
-                        'company_name': quotation.customer.company_name,
-                        'address': quotation.customer.primary_address
-                    },
-                    'products':[
-                        {
-                            'id': item.id,
-                            'product_id': item.product.id,
-                            'name' : item.product.name,
-                            'selling_price': float(item.selling_price),
-                            'quantity': item.quantity,
-                            'percentage_discount': float(item.discount) if item.discount else 0.0,
-                            'description': item.product.description if hasattr(item.product, 'description') else '',
-                        } for item in quotation.details.all() 
-                    ],
-                    'assigned_to': {
-                        'id': quotation.assigned_to.id if quotation.assigned_to else None,
-                        'name': quotation.assigned_to.get_full_name() if quotation.assigned_to else None
-                    },
-                    'created_by': {
-                        'id': quotation.created_by.id if quotation.created_by else None,
-                        'name': quotation.created_by.get_full_name() if quotation.created_by else None
-                    },
-                    'created_at': quotation.created_at,
-                    'emailed_at': quotation.emailed_at,
-                    'follow_up_date': quotation.follow_up_date,
-                    'activity_logs': logs_by_quotation.get(quotation.id, [])[:10],
-                })
-            return JsonResponse({'data': data})
-        
+            for row in page:
+                quotation = build(row)
+                for field, by_quotation in related.items():
+                    quotation[field] = by_quotation.get(row[0], [])
+                data.append(quotation)
+            return FastJsonResponse({'data': data, 'next_cursor': next_cursor})
+
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
+            logger.exception("Unhandled exception in QuotationListView.get")
             return JsonResponse({'error': 'An internal server error occurred.'}, status=500)
        
 class QuotationPDFView(BaseAPIView):
     def get(self, request, quotation_id):
-        quotation = get_object_or_404(Quotation, pk=quotation_id)
+        quotation = get_object_or_404(
+            Quotation.objects.select_related('customer', 'created_by').prefetch_related('details'),
+            pk=quotation_id
+        )
         
         try:
-            pdf_url = save_quotation_pdf(quotation, request)
+            # Rendered as the quotation's creator so an unchanged quotation hits
+            # the stored file from creation time instead of rebuilding it.
+            _, pdf_url = render_quotation_pdf(
+                quotation,
+                quotation.created_by,
+                quotation_items_data(quotation),
+                terms=list(quotation.terms.values_list('id', flat=True)),
+                base_url=request.build_absolute_uri('/'),
+            )
             
             return JsonResponse({
                 'success': True,
@@ -616,6 +695,65 @@ class QuotationPDFView(BaseAPIView):
             }, status=500)
 
 
+class PDFCacheStatsView(AdminRequiredMixin, BaseAPIView):
+    def get(self, request):
+        return JsonResponse({'data': {
+            'pdf_cache': get_cache_stats(),
+            'image_cache': get_fetch_stats(),
+            'merge_cache': get_merge_cache_stats(),
+        }})
+
+
+class PDFRenderBatchView(AdminRequiredMixin, BaseAPIView):
+    def post(self, request):
+        """
+        Queues a re-render of every quotation matching the posted filters.
+        `force` rebuilds PDFs that already have a matching stored file.
+        """
+        filters = request.json
+        force = filters.get('force', False) if isinstance(filters, dict) else False
+        try:
+            batch = create_pdf_batch(
+                filters,
+                requested_by=request.user,
+                base_url=request.build_absolute_uri('/'),
+                force=bool(force),
+            )
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+        return JsonResponse({
+            'success': True,
+            'message': f"Queued {batch.total} quotation(s) for rendering",
+            'data': {
+                'id': batch.id,
+                'filters': batch.filters,
+                'progress': batch_progress(batch),
+            }
+        }, status=201)
+
+
+class PDFRenderBatchDetailView(AdminRequiredMixin, BaseAPIView):
+    def get(self, request, batch_id):
+        batch = get_object_or_404(PDFRenderBatch, pk=batch_id)
+        return JsonResponse({'data': {
+            'id': batch.id,
+            'filters': batch.filters,
+            'created_at': batch.created_at,
+            'progress': batch_progress(batch),
+        }})
+
+    def post(self, request, batch_id):
+        """Resumes the batch by re-queueing its failed and interrupted jobs."""
+        batch = get_object_or_404(PDFRenderBatch, pk=batch_id)
+        requeued = resume_pdf_batch(batch)
+        return JsonResponse({
+            'success': True,
+            'message': f"Re-queued {requeued} job(s)",
+            'data': {'id': batch.id, 'progress': batch_progress(batch)}
+        })
+
+
 class QuotationDetailView(BaseAPIView):
     def get(self, request, quotation_id):
         """
@@ -661,27 +799,9 @@ class LeadQuotationsView(JWTAuthMixin, BaseAPIView):
         try:
             lead = get_object_or_404(Lead, pk=lead_id)
 
-            quotations = Quotation.objects.filter(lead_links__lead=lead).select_related(
-                'customer', 'assigned_to', 'created_by'
-            ).prefetch_related('terms', 'details__product').order_by('-created_at')
-
-            data = []
-            for quotation in quotations:
-                data.append({
-                    'id': quotation.id,
-                    'quotation_number': quotation.quotation_number,
-                    'status': quotation.status,
-                    'url': quotation.file_url,
-                    'subtotal': float(quotation.subtotal),
-                    'total': float(quotation.total),
-                    'created_at': quotation.created_at,
-                    'assigned_to': {
-                        'id': quotation.assigned_to.id if quotation.assigned_to else None,
-                        'name': quotation.assigned_to.get_full_name() if quotation.assigned_to else None
-                    }
-                })
-
-            return JsonResponse({'data': data}, status=200)
+            quotations = Quotation.objects.filter(lead_links__lead=lead).order_by('-created_at')
+            data = QUOTATION_SUMMARY.rows(quotations)
+            return FastJsonResponse({'data': data}, status=200)
         except Exception as e:
             logger.exception("Failed to fetch lead quotations")
             return JsonResponse({'success': False, 'error': 'Internal server error'}, status=500)
@@ -772,36 +892,40 @@ class CustomerListView(JWTAuthMixin,BaseAPIView):
     def get(self, request):
         user = request.user
 
-        leads_qs = Lead.objects.select_related('assigned_to', 'created_by')
-
+        visible_leads = Lead.objects.all()
         if getattr(user, 'role', None) == 'SALESPERSON':
-            leads_qs = leads_qs.filter(Q(assigned_to=user) | Q(created_by=user))
-
-        customers = Customer.objects.prefetch_related(
-            Prefetch('leads', queryset=leads_qs, to_attr='filtered_leads')
-        ).order_by('-created_at')
+            visible_leads = visible_leads.filter(Q(assigned_to=user) | Q(created_by=user))
+
+        # Customers with any visible lead are listed; only their open leads are embedded.
+        open_leads = visible_leads.exclude(
+            status__in=[LeadStatus.CONVERTED, LeadStatus.LOST]
+        ).select_related('assigned_to', 'created_by')
+
+        customers = list(Customer.objects.filter(
+            Exists(visible_leads.filter(customer=OuterRef('pk')))
+        ).prefetch_related(
+            Prefetch('leads', queryset=open_leads, to_attr='filtered_leads')
+        ).order_by('-created_at'))
+
+        quotation_ids = {
+            lead.quotation_id
+            for customer in customers
+            for lead in customer.filtered_leads
+            if lead.quotation_id
+        }
+        file_urls = dict(
+            Quotation.objects.filter(id__in=quotation_ids).values_list('id', 'file_url')
+        ) if quotation_ids else {}
 
         data = []
         for customer in customers:
-            filtered_leads = getattr(customer, 'filtered_leads', [])
-            if not filtered_leads:
-                continue
-
             leads_data = []
-            for lead in filtered_leads:
-                file_url = None
-                if lead.quotation_id:
-                    try:
-                        file_url = Quotation.objects.get(pk=lead.quotation_id).file_url
-                    except Quotation.DoesNotExist:
-                        pass
-                if lead.status in [LeadStatus.CONVERTED, LeadStatus.LOST]:
-                    continue
+            for lead in customer.filtered_leads:
                 leads_data.append({
                     'id': lead.id,
                     'status': lead.status,
                     'lead_source': lead.lead_source,
-                    'file_url': file_url,
+                    'file_url': file_urls.get(lead.quotation_id),
                     'quotation': lead.quotation_id,
                     'assigned_to': {
                         'id': lead.assigned_to.id if lead.assigned_to else None,
@@ -830,156 +954,91 @@ class CustomerListView(JWTAuthMixin,BaseAPIView):
         return JsonResponse({'data': data}, safe=False)
     
 class AllCustomerListView(JWTAuthMixin,BaseAPIView):
+    """
+    Customers one keyset page at a time (`?limit=`, `?cursor=`). Children are
+    opt-in with `?expand=leads,quotations,items,logs` and are only loaded for
+    the customers on the page; the body is streamed customer by customer.
+    """
+    EXPANSIONS = ('leads', 'quotations', 'items', 'logs')
+
     def get(self, request):
         user = getattr(request, "user", None)
-        
+
+        leads_qs = Lead.objects.all()
+        quotations_qs = Quotation.objects.all()
+        customers = Customer.objects.all()
         if user and getattr(user, "role", None) == Roles.SALESPERSON:
-            leads_qs = Lead.objects.filter(Q(assigned_to=user) | Q(created_by=user))
-
-            quotations_qs = Quotation.objects.filter(Q(assigned_to=user) | Q(created_by=user))
-            customer_filter = Q(leads__in=leads_qs) | Q(quotations__in=quotations_qs)
-
-            customers = Customer.objects.filter(
-                customer_filter
-            ).prefetch_related(
-                Prefetch('leads', queryset=leads_qs, to_attr='filtered_leads'),
-                Prefetch('quotations', queryset=quotations_qs, to_attr='filtered_quotations'),
-                'filtered_leads__assigned_to',
-                'filtered_quotations__assigned_to',
-                'filtered_quotations__details__product',
-                'filtered_quotations__terms'
-            ).distinct().order_by('-created_at')
-        else:
-            customers = Customer.objects.prefetch_related(
-                'leads__assigned_to', 
-                'quotations__assigned_to',
-                'quotations__details__product',
-                'quotations__terms'
-            ).order_by('-created_at')
-
-        all_lead_ids = set()
-        all_quotation_ids = set()
-        for customer in customers:
-            leads = getattr(customer, 'filtered_leads', customer.leads.all())
-            quotations = getattr(customer, 'filtered_quotations', customer.quotations.all())
-            for lead in leads:
-                all_lead_ids.add(lead.id)
-                if lead.quotation_id:
-                    all_quotation_ids.add(lead.quotation_id)
-            for quotation in quotations:
-                all_quotation_ids.add(quotation.id)
-
-        quotations_map = {
-            q.id: q.file_url 
-            for q in Quotation.objects.filter(id__in=all_quotation_ids).only('id', 'file_url')
-        }
+            leads_qs = leads_qs.filter(Q(assigned_to=user) | Q(created_by=user))
+            quotations_qs = quotations_qs.filter(Q(assigned_to=user) | Q(created_by=user))
+            customers = customers.filter(
+                Exists(leads_qs.filter(customer=OuterRef('pk')))
+                | Exists(quotations_qs.filter(customer=OuterRef('pk')))
+            )
 
-        lead_activity_logs = ActivityLog.objects.filter(
-            entity_type='Lead',
-            entity_id__in=[str(lid) for lid in all_lead_ids]
-        ).select_related('actor').order_by('-created_at')
-
-        logs_by_lead = {}
-        for log in lead_activity_logs:
-            lead_id = int(log.entity_id)
-            if lead_id not in logs_by_lead:
-                logs_by_lead[lead_id] = []
-            logs_by_lead[lead_id].append({
-                'id': log.id, 'action': log.action, 'message': log.message,
-                'actor': {'id': log.actor.id if log.actor else None, 'name': log.actor.get_full_name() if log.actor else 'System'},
-                'created_at': log.created_at
-            })
+        columns = CUSTOMER.columns
+        try:
+            expand = requested_fields(request, self.EXPANSIONS, always=(), param='expand') or set()
+            page, next_cursor = keyset_page(
+                customers.values_list(*columns), request,
+                key=lambda row: (row[columns.index('created_at')], row[0]),
+            )
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
-        quotation_activity_logs = ActivityLog.objects.filter(
-            entity_type='Quotation',
-            entity_id__in=[str(qid) for qid in all_quotation_ids]
-        ).select_related('actor').order_by('-created_at')
-
-        logs_by_quotation = {}
-        for log in quotation_activity_logs:
-            quotation_id = int(log.entity_id)
-            if quotation_id not in logs_by_quotation:
-                logs_by_quotation[quotation_id] = []
-            logs_by_quotation[quotation_id].append({
-                'id': log.id, 'action': log.action, 'message': log.message,
-                'actor': {'id': log.actor.id if log.actor else None, 'name': log.actor.get_full_name() if log.actor else 'System'},
-                'created_at': log.created_at
-            })
+        if 'items' in expand:
+            expand.add('quotations')
+        customer_ids = [row[0] for row in page]
 
-        data = []
-        for customer in customers:
-            leads = getattr(customer, 'filtered_leads', customer.leads.all())
-            quotations = getattr(customer, 'filtered_quotations', customer.quotations.all())
-            leads_data = []
-            for lead in leads:
-                leads_data.append({
-                    'id': lead.id,
-                    'status': lead.status,
-                    'lead_source': lead.lead_source,
-                    'file_url': quotations_map.get(lead.quotation_id),
-                    'quotation_id': lead.quotation_id,
-                    'assigned_to': {
-                        'id': lead.assigned_to.id if lead.assigned_to else None,
-                        'name': lead.assigned_to.get_full_name() if lead.assigned_to else None,
-                    },
-                    'created_at': lead.created_at,
-                    'activity_logs': logs_by_lead.get(lead.id, [])[:10]
-                })
-            quotations_data = []
-            for quotation in quotations:
-                if not quotation.file_url:
-                    continue
-                quotations_data.append({
-                    'id': quotation.id,
-                    'quotation_number': quotation.quotation_number,
-                    'status': quotation.status,
-                    'url': quotation.file_url,
-                    'discount': float(quotation.discount) if quotation.discount else 0.0,
-                    'discount_type': quotation.discount_type,
-                    'subtotal': float(quotation.subtotal),
-                    'tax_rate': float(quotation.tax_rate), 
-                    'total': float(quotation.total),
-                    'terms': [
-                        {'id': term.id, 'title': term.title}
-                        for term in quotation.terms.all()
-                    ],   
-                    'items':[
-                        {
-                            'id': item.id,
-                            'product_id': item.product.id,
-                            'name' : item.product.name,
-                            'selling_price': float(item.selling_price),
-                            'quantity': item.quantity,
-                            'percentage_discount': float(item.discount) if item.discount else 0.0,
-                            'description': item.product.description if hasattr(item.product, 'description') else '',
-                        } for item in quotation.details.all() 
-                    ],
-                    'assigned_to': {
-                        'id': quotation.assigned_to.id if quotation.assigned_to else None,
-                        'name': quotation.assigned_to.get_full_name() if quotation.assigned_to else None
-                    },
-                    'created_at': quotation.created_at,
-                    'emailed_at': quotation.emailed_at,
-                    'follow_up_date': quotation.follow_up_date,
-                    'activity_logs': logs_by_quotation.get(quotation.id, [])[:10]
-                })
-            data.append({
-                'id': customer.id,
-                'name': customer.name,
-                'email': customer.email,
-                'company_name': customer.company_name,
-                'gst_number': customer.gst_number,
-                'website': customer.website,
-                'shipping_address': customer.shipping_address,
-                'billing_address': customer.billing_address,
-                'primary_address': customer.primary_address,
-                'title': customer.title,
-                'phone': customer.phone,
-                'created_at': customer.created_at,
-                'leads': leads_data,
-                'quotations': quotations_data,
-            })
-        return JsonResponse({'data': data})
+        leads_by_customer = {}
+        if 'leads' in expand:
+            leads_by_customer = group_rows(
+                LEAD, leads_qs.filter(customer_id__in=customer_ids).order_by('id'), 'customer_id'
+            )
+
+        quotations_by_customer = {}
+        if 'quotations' in expand:
+            quotations_by_customer = group_rows(
+                QUOTATION,
+                quotations_qs.filter(customer_id__in=customer_ids)
+                .exclude(Q(file_url__isnull=True) | Q(file_url='')).order_by('-created_at'),
+                'customer_id',
+            )
+            quotation_ids = [q['id'] for quotations in quotations_by_customer.values() for q in quotations]
+            terms = group_rows(
+                TERM_REF, Quotation.objects.filter(id__in=quotation_ids, terms__isnull=False).order_by('terms__id'), 'id'
+            )
+            items = {}
+            if 'items' in expand:
+                items = group_rows(
+                    LINE_ITEM, ProductDetails.objects.filter(quotation_id__in=quotation_ids).order_by('id'), 'quotation_id'
+                )
+            for quotations in quotations_by_customer.values():
+                for quotation in quotations:
+                    quotation['terms'] = terms.get(quotation['id'], [])
+                    if 'items' in expand:
+                        quotation['items'] = items.get(quotation['id'], [])
+
+        if 'logs' in expand:
+            for entity_type, by_customer in (('Lead', leads_by_customer), ('Quotation', quotations_by_customer)):
+                entities = [entity for entities in by_customer.values() for entity in entities]
+                logs = ActivityLog.latest_for(entity_type, [entity['id'] for entity in entities])
+                for entity in entities:
+                    entity['activity_logs'] = [serialize_list_log(log) for log in logs.get(entity['id'], [])]
+
+        build = CUSTOMER.compile(columns)
+
+        def serialize_customer(row):
+            data = build(row)
+            if 'leads' in expand:
+                data['leads'] = leads_by_customer.get(row[0], [])
+            if 'quotations' in expand:
+                data['quotations'] = quotations_by_customer.get(row[0], [])
+            return data
+
+        return StreamingHttpResponse(
+            stream_json_page(page, next_cursor, serialize_customer),
+            content_type='application/json',
+        )
     
 class CustomerCreateView(JWTAuthMixin,BaseAPIView):
 
@@ -1123,19 +1182,12 @@ class FilteredCustomerListView(JWTAuthMixin, BaseAPIView):
                     "FilteredCustomerListView: building queryset for salesperson",
                     extra={"user_id": user.id, "username": getattr(user, "username", None)}
                 )
-                customers_qs = Customer.objects.filter(
-                    Q(leads__assigned_to=user)
-                    | Q(leads__created_by=user)
-                    | Q(quotations__assigned_to=user)
-                    | Q(quotations__created_by=user)
-                    | Q(created_by=user)
-                ).distinct()
             else:
                 logger.debug(
                     "FilteredCustomerListView: fetching all customers (non-salesperson or admin)",
                     extra={"user_id": getattr(user, "id", None)}
                 )
-                customers_qs = Customer.objects.all()
+            customers_qs = customers_visible_to(user)
 
             customers = customers_qs.order_by('-created_at')
             data = []
@@ -1163,9 +1215,12 @@ class FilteredCustomerListView(JWTAuthMixin, BaseAPIView):
             )
             return JsonResponse({'error': 'An internal server error occurred.'}, status=500)
 
-class UnfilteredCustomerListView(JWTAuthMixin, BaseAPIView):
+class UnfilteredCustomerListView(JWTAuthMixin, ConditionalGetMixin, BaseAPIView):
     """Returns all customers without any role-based filtering. Requires authentication."""
-    
+
+    def get_validator(self, request):
+        return queryset_validator(Customer.objects.all())
+
     def get(self, request):
         try:
             customers = Customer.objects.all().order_by('-created_at')
@@ -1196,62 +1251,100 @@ class UnfilteredCustomerListView(JWTAuthMixin, BaseAPIView):
             }, status=500)
         
 class ProductSearchView(JWTAuthMixin, BaseAPIView):
+    """
+    Ranked product search over name, brand, category and description.
+    `name` is the search term; `limit` and `offset` page the results.
+    """
     def get(self, request):
         name = request.GET.get('name', '').strip()
         if not name:
             return JsonResponse({'error': 'Missing "name" parameter'}, status=400)
-        products = Product.objects.filter(Q(name__icontains=name)).order_by('-created_at')
-        data = []
-        for product in products:
-            data.append({
-                'id': product.id,
-                'name': product.name,
-                'category': product.category.name if product.category else None,
-                'cost_price': float(product.cost_price),
-                'selling_price': float(product.selling_price),
-                'tax_rate': float(product.tax_rate),
-                'unit': product.unit,
-                'description': product.description,
-                'is_available': product.is_available,
-                'active': product.active,
-                'brand': product.brand
-            })
-        return JsonResponse({'data': data})
-
-class CustomerSearchView(BaseAPIView):
+        try:
+            limit = page_size(request, default=20, maximum=50)
+            offset = page_offset(request)
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        rows = search_products(name, limit, offset)
+        next_offset = offset + limit if len(rows) > limit else None
+        return FastJsonResponse({'data': rows[:limit], 'next_offset': next_offset})
+
+class ProductAutocompleteView(JWTAuthMixin, BaseAPIView):
+    """
+    Product suggestions for `q` (a prefix of any word of the name or brand)
+    from the in-process index, without touching the database.
+    """
+    def get(self, request):
+        try:
+            limit = page_size(request, default=10, maximum=20)
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'data': product_index.suggest(request.GET.get('q', ''), limit)})
+
+class CustomerSearchView(JWTAuthMixin, BaseAPIView):
+    """
+    Typeahead over the customers the user can see (same scope as
+    FilteredCustomerListView): name, company, phone and email, ranked.
+    `name` is the search term; `limit` and `offset` page the results.
+    """
     def get(self, request):
         name = request.GET.get('name', '').strip()
         if not name:
             return JsonResponse({'error': 'Missing "name" parameter'}, status=400)
-        customers = Customer.objects.filter(Q(name__icontains=name)).order_by('-created_at')
-        data = []
-        for customer in customers:
-            data.append({
-                'id': customer.id,
-                'name': customer.name,
-                'email': customer.email,
-                'company_name': customer.company_name,
-                'phone': customer.phone,
-                'address': customer.primary_address
-            })
-        return JsonResponse({'data': data})
+        try:
+            limit = page_size(request, default=10, maximum=50)
+            offset = page_offset(request)
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        rows = search_customers(request.user, name, limit, offset)
+        next_offset = offset + limit if len(rows) > limit else None
+        return FastJsonResponse({'data': rows[:limit], 'next_offset': next_offset})
 
 
-class CompanyListView(BaseAPIView):
+class CompanyListView(ConditionalGetMixin, BaseAPIView):
+    """
+    Customer company names from the CustomerCompany directory, A-Z.
+    `q` filters by prefix; `limit` and `offset` page the list (all of it
+    without `limit`).
+    """
+    def get_validator(self, request):
+        return queryset_validator(CustomerCompany.objects.all())
+
     def get(self, request):
-        companies_qs = Customer.objects.exclude(company_name__isnull=True).exclude(company_name__exact='')
-        companies = companies_qs.values_list('company_name', flat=True).distinct().order_by('company_name')
-        return JsonResponse({'data': list(companies)})
+        companies = CustomerCompany.objects.filter(customer_count__gt=0).order_by('normalized_name')
+        prefix = normalize_company_name(request.GET.get('q'))
+        if prefix:
+            companies = companies.filter(normalized_name__startswith=prefix)
+        names = companies.values_list('name', flat=True)
+        if not request.GET.get('limit'):
+            return JsonResponse({'data': list(names)})
+
+        try:
+            limit = page_size(request)
+            offset = page_offset(request)
+        except InvalidPageRequest as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        names = list(names[offset:offset + limit + 1])
+        next_offset = offset + limit if len(names) > limit else None
+        return JsonResponse({'data': names[:limit], 'next_offset': next_offset})
 
 #region Product Management
-class ProductListView(BaseAPIView):
+class ProductListView(ConditionalGetMixin, BaseAPIView):
+    def get_validator(self, request):
+        # Each row shows its category's name, so renames must change the ETag too.
+        return queryset_validator(Product.objects.all()), queryset_validator(Category.objects.all())
+
     def get(self, request):
         products = Product.objects.all().prefetch_related('images').order_by('-created_at')        
         data = []
         for product in products:
             image_url = []
+            original_url = []
             if product.image:
-                image_url.append(request.build_absolute_uri(product.image.url))
+                original_url.append(request.build_absolute_uri(product.image.url))
+                list_image = product.image_list or product.image
+                image_url.append(request.build_absolute_uri(list_image.url))
             data.append({
                 'id': product.id,
                 'name': product.name,
@@ -1260,6 +1353,7 @@ class ProductListView(BaseAPIView):
                 'selling_price': float(product.selling_price),
                 'unit': product.unit,                
                 'images': image_url,               
+                'original_images': original_url,
                 'description': product.description,
                 'is_available': product.is_available,
                 'active': product.active,
@@ -1347,15 +1441,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
 #region Dashboard Stats
 class AdminDashboardStatsView(AdminRequiredMixin, BaseAPIView):
     def get(self, request):
-        stats = {
-            'total_salespeople': User.objects.filter(role=Roles.SALESPERSON).count(),
-            'active_salespeople': User.objects.filter(role=Roles.SALESPERSON, is_active=True).count(),
-            'total_quotations': Quotation.objects.count(),
-            'total_leads': Lead.objects.count(),
-            'total_customers': Customer.objects.count(),
-            'total_products': Product.objects.filter(is_active=True).count()
-        }
-        return JsonResponse({'data': stats})
+        return JsonResponse({'data': admin_dashboard_stats()})
 
 
 class SalespersonDashboardStatsView(SalespersonRequiredMixin, BaseAPIView):
@@ -1480,42 +1566,28 @@ class TopPerfomerView(BaseAPIView):
             return JsonResponse({'error': 'An internal server error occurred.'}, status=500)
 
 class PopupView(JWTAuthMixin, BaseAPIView):
+    SHAPE = RowShape(
+        ('id', 'id'),
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('source', 'lead_source'),
+        ('follow_up_date', 'follow_up_date'),
+        ('notes', 'notes'),
+        ('customer', CUSTOMER_SUMMARY.nested('customer__')),
+        ('assigned_to', USER_REF.nested('assigned_to__')),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
     def get(self, request):
         user = request.user
         today = datetime.today().date()
-        leads_qs = Lead.objects.select_related('customer', 'assigned_to', 'created_by').filter(
+        leads_qs = Lead.objects.filter(
             Q(follow_up_date=today) | Q(id__in=LeadDescription.objects.filter(next_date=today).values_list('lead_id', flat=True))
         ).distinct()
 
         if getattr(user, 'role', None) == Roles.SALESPERSON:
             leads_qs = leads_qs.filter(Q(assigned_to=user) | Q(created_by=user))
 
-        leads_qs = leads_qs.order_by('-created_at')
-        data = []
-        for lead in leads_qs:
-            customer = lead.customer
-            assigned_to = lead.assigned_to
-            
-            data.append({
-                'id': lead.id,
-                'status': lead.status,
-                'priority': lead.priority,
-                'source': lead.lead_source,
-                'follow_up_date': lead.follow_up_date,
-                'notes': lead.notes,
-                'customer': {
-                    'id': customer.id if customer else None,
-                    'name': getattr(customer, 'name', None),
-                    'email': getattr(customer, 'email', None),
-                    'phone': getattr(customer, 'phone', None),
-                    'company_name': getattr(customer, 'company_name', None),
-                },
-                'assigned_to': {
-                    'id': assigned_to.id if assigned_to else None,
-                    'name': assigned_to.get_full_name() if assigned_to else None,
-                },
-                'created_at': lead.created_at,
-                'updated_at': lead.updated_at,
-            })
-
-        return JsonResponse({'data': data}, status=200, safe=False)
+        data = self.SHAPE.rows(leads_qs.order_by('-created_at'))
+        return FastJsonResponse({'data': data}, status=200)
@@ -1,5 +1,6 @@
 import os
 import json
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -35,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-Party Apps
     'rest_framework',
@@ -100,6 +102,18 @@ DATABASES = {
     )
 }
 
+# --- Cache ---
+# --------------------------------------------------------------------------
+# File-based by default so counters and cached data are shared between the
+# gunicorn workers and the PDF render workers on the same host. Point
+# CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached for multi-host setups.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'qms_cache')),
+    }
+}
+
 # --- User & Authentication ---
 # --------------------------------------------------------------------------
 AUTH_USER_MODEL = 'accounts.User'
@@ -204,3 +218,30 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 # --------------------------------------------------------------------------
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 QUOTATION_PREFIX = os.getenv('QUOTATION_PREFIX', 'QTN')
+
+# Quotation PDFs are built by `python manage.py render_pdfs` when this is on.
+PDF_RENDER_ASYNC = str(os.getenv('PDF_RENDER_ASYNC', 'True')).lower() == 'true'
+PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', '2'))
+# Failed renders are retried until a job has this many attempts; a job RUNNING longer than PDF_RENDER_STALE_SECONDS is reclaimed.
+PDF_RENDER_MAX_ATTEMPTS = int(os.getenv('PDF_RENDER_MAX_ATTEMPTS', '3'))
+PDF_RENDER_STALE_SECONDS = int(os.getenv('PDF_RENDER_STALE_SECONDS', '600'))
+# Load letterhead logos and paragraph styles once at startup instead of on the first PDF.
+PDF_WARM_ASSETS = str(os.getenv('PDF_WARM_ASSETS', 'True')).lower() == 'true'
+# Remote product images and signatures are fetched in parallel and cached as thumbnails.
+PDF_IMAGE_FETCH_WORKERS = int(os.getenv('PDF_IMAGE_FETCH_WORKERS', '8'))
+PDF_IMAGE_FETCH_TIMEOUT = float(os.getenv('PDF_IMAGE_FETCH_TIMEOUT', '3'))
+PDF_IMAGE_FETCH_DEADLINE = float(os.getenv('PDF_IMAGE_FETCH_DEADLINE', '10'))
+PDF_IMAGE_CACHE_DIR = os.getenv('PDF_IMAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'qms_pdf_images'))
+PDF_IMAGE_CACHE_MAX_FILES = int(os.getenv('PDF_IMAGE_CACHE_MAX_FILES', '2000'))
+PDF_IMAGE_CACHE_MAX_AGE = int(os.getenv('PDF_IMAGE_CACHE_MAX_AGE', str(24 * 60 * 60)))
+# PDFs merged by URL are downloaded in parallel; our own media URLs are read from disk.
+PDF_MERGE_FETCH_WORKERS = int(os.getenv('PDF_MERGE_FETCH_WORKERS', '4'))
+PDF_MERGE_FETCH_TIMEOUT = float(os.getenv('PDF_MERGE_FETCH_TIMEOUT', '10'))
+# Activity logs older than this are moved to the archive table by `archive_activity_logs`.
+ACTIVITY_LOG_RETENTION_DAYS = int(os.getenv('ACTIVITY_LOG_RETENTION_DAYS', '365'))
+# Product autocomplete is served from a per-process index; other processes' changes show up within this many seconds.
+PRODUCT_AUTOCOMPLETE_CHECK_SECONDS = float(os.getenv('PRODUCT_AUTOCOMPLETE_CHECK_SECONDS', '2'))
+# Build the autocomplete index at startup instead of on the first suggestion (needs the database).
+PRODUCT_AUTOCOMPLETE_WARM = str(os.getenv('PRODUCT_AUTOCOMPLETE_WARM', 'False')).lower() == 'true'
+# Admin dashboard counts are cached this long; saves and deletes of counted rows clear them sooner.
+ADMIN_DASHBOARD_CACHE_SECONDS = int(os.getenv('ADMIN_DASHBOARD_CACHE_SECONDS', '60'))